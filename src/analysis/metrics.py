@@ -1,5 +1,7 @@
 import numpy as np
 
+from processing.signal import Events, Signal
+
 
 def metrics(gt_t, gt_a, det_t, det_a, tol):
     """
@@ -7,22 +9,29 @@ def metrics(gt_t, gt_a, det_t, det_a, tol):
     intensities.
 
     Parameters:
-        - gt_t: Ground truth times.
-        - gt_a: Ground truth amplitudes.
-        - det_t: Detected times.
+        - gt_t: Ground truth times, Events, or a dense ground truth Signal.
+        - gt_a: Ground truth amplitudes (None for Events or a Signal).
+        - det_t: Detected times (possibly none).
         - det_a: Detected amplitudes.
         - tol: Tolerance for time matching.
 
     Returns:
         - Dictionary with sensitivity, specificity, time_accuracy, and
-          MAE_intensity.
+          MAE_intensity. Without detections, sensitivity and specificity are 0
+          and the errors are NaN.
     """
+    # Unpack ground truth events, extracting them from a dense signal if needed
+    if isinstance(gt_t, Signal):
+        gt_t = gt_t.events()
+    if isinstance(gt_t, Events):
+        gt_t, gt_a = gt_t.t, gt_t.amplitude
 
     # Preallocate arrays for matched indices
     tp_idx, matched_idx = [], []
 
-    # Match detected peaks to ground truth peaks within tolerance
-    for i, gt in enumerate(gt_t):
+    # Match detected peaks to ground truth peaks within tolerance, no
+    # detections leave every ground truth peak missed
+    for i, gt in enumerate(gt_t if len(det_t) else []):
         diff = np.abs(det_t - gt)
         closest = np.argmin(diff)
         if diff[closest] <= tol:
@@ -50,3 +59,111 @@ def metrics(gt_t, gt_a, det_t, det_a, tol):
         "time_accuracy": time_acc,
         "mae_intensity": mae_amp,
     }
+
+
+def nearest_detections(gt_t, det_t):
+    """
+    Find the closest detected peak for every ground truth peak.
+
+    Ties are resolved like np.argmin, towards the lowest detection index.
+
+    Parameters:
+        - gt_t: Ground truth times.
+        - det_t: Detected times (at least one).
+
+    Returns:
+        - Index of the closest detection and its absolute time difference,
+          one per ground truth peak.
+    """
+    gt_t = np.asarray(gt_t, dtype=float)
+    det_t = np.asarray(det_t, dtype=float)
+
+    # Sort detections once and locate each ground truth time between neighbours
+    order = np.argsort(det_t, kind="stable")
+    sorted_t = det_t[order]
+    pos = np.searchsorted(sorted_t, gt_t)
+    right = np.minimum(pos, len(det_t) - 1)
+    left = np.maximum(pos - 1, 0)
+
+    # Move the left neighbour to the first of its duplicates, as np.argmin would
+    left = np.searchsorted(sorted_t, sorted_t[left])
+
+    diff_left = np.abs(gt_t - sorted_t[left])
+    diff_right = np.abs(gt_t - sorted_t[right])
+    use_right = (diff_right < diff_left) | (
+        (diff_right == diff_left) & (order[right] < order[left])
+    )
+
+    closest = np.where(use_right, order[right], order[left])
+    dist = np.where(use_right, diff_right, diff_left)
+    return closest, dist
+
+
+def metrics_curve(gt_t, gt_a, det_t, det_a, tols):
+    """
+    Compute the metrics of metrics() for several tolerances at once.
+
+    Nearest-neighbour matching is done once, and the counts and errors of every
+    tolerance are read from cumulative sums over the sorted match distances.
+
+    Parameters:
+        - gt_t: Ground truth times, Events, or a dense ground truth Signal.
+        - gt_a: Ground truth amplitudes (None for Events or a Signal).
+        - det_t: Detected times.
+        - det_a: Detected amplitudes.
+        - tols: Array of tolerances for time matching.
+
+    Returns:
+        - Dictionary of arrays, one value per tolerance: tol, tp, fp, fn,
+          sensitivity, specificity, time_accuracy and mae_intensity.
+    """
+    # Unpack ground truth events, extracting them from a dense signal if needed
+    if isinstance(gt_t, Signal):
+        gt_t = gt_t.events()
+    if isinstance(gt_t, Events):
+        gt_t, gt_a = gt_t.t, gt_t.amplitude
+
+    tols = np.atleast_1d(np.asarray(tols, dtype=float))
+    gt_a = np.asarray(gt_a, dtype=float)
+    det_a = np.asarray(det_a, dtype=float)
+    n_gt, n_det = len(gt_t), len(det_t)
+
+    if n_gt and n_det:
+        closest, dist = nearest_detections(gt_t, det_t)
+        amp_err = np.abs(gt_a - det_a[closest])
+    else:
+        closest = np.zeros(0, dtype=int)
+        dist = amp_err = np.zeros(0)
+
+    # True positives: ground truth peaks whose closest detection is within tol
+    order = np.argsort(dist)
+    tp = np.searchsorted(dist[order], tols, side="right")
+
+    # Detections matched at tol: those that are the closest one of some ground
+    # truth peak at a distance within tol
+    det_dist = np.full(n_det, np.inf)
+    np.minimum.at(det_dist, closest, dist)
+    matched = np.searchsorted(np.sort(det_dist), tols, side="right")
+
+    fn = n_gt - tp
+    fp = n_det - matched
+
+    # Mean errors of the tp closest matches via cumulative sums
+    time_cum = np.concatenate(([0.0], np.cumsum(dist[order])))
+    amp_cum = np.concatenate(([0.0], np.cumsum(amp_err[order])))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sens = np.where(tp + fn > 0, tp / np.maximum(tp + fn, 1), 0.0)
+        spec = np.where(tp + fp > 0, tp / np.maximum(tp + fp, 1), 0.0)
+        time_acc = np.where(tp > 0, time_cum[tp] / tp, np.nan)
+        mae_amp = np.where(tp > 0, amp_cum[tp] / tp, np.nan)
+
+    return {
+        "tol": tols,
+        "tp": tp,
+        "fp": fp,
+        "fn": fn,
+        "sensitivity": sens,
+        "specificity": spec,
+        "time_accuracy": time_acc,
+        "mae_intensity": mae_amp,
+    }
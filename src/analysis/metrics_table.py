@@ -0,0 +1,258 @@
+import numpy as np
+
+# Metric columns, in the order returned by analysis.metrics.metrics
+METRIC_NAMES = ("sensitivity", "specificity", "time_accuracy", "mae_intensity")
+
+# Metrics where a smaller value is better
+LOWER_IS_BETTER = {"time_accuracy", "mae_intensity"}
+
+
+def format_params(params):
+    """
+    Convert a parameter dictionary into a canonical string key.
+
+    Parameters:
+        params (dict or None): Parameter names and values.
+
+    Returns:
+        str: Sorted "name=value" pairs joined by ";" (empty for no params).
+    """
+    if not params:
+        return ""
+    return ";".join(f"{k}={params[k]!r}" for k in sorted(params))
+
+
+class MetricsTable:
+    """
+    Consolidated metrics of a run, one row per sample, method and parameter
+    set, stored in a single NPZ file instead of one text file per sample.
+    """
+
+    def __init__(self):
+        self._sample = []
+        self._method = []
+        self._params = []
+        self._values = []
+        self._cache = None
+
+    def __len__(self):
+        return len(self._sample)
+
+    def add(self, sample, method, met, params=None):
+        """
+        Append the metrics of one sample.
+
+        Parameters:
+            sample (str): Sample name.
+            method (str): Method name.
+            met (dict): Metrics as returned by analysis.metrics.metrics.
+            params (dict or str): Parameter set used by the method.
+        """
+        if not isinstance(params, str):
+            params = format_params(params)
+        self._sample.append(sample)
+        self._method.append(method)
+        self._params.append(params)
+        self._values.append([met[k] for k in METRIC_NAMES])
+        self._cache = None
+
+    def extend(self, other):
+        """Append all rows of another table."""
+        arrays = other.arrays()
+        self._sample.extend(arrays["sample"].tolist())
+        self._method.extend(arrays["method"].tolist())
+        self._params.extend(arrays["params"].tolist())
+        self._values.extend(arrays["values"].tolist())
+        self._cache = None
+
+    def arrays(self):
+        """
+        Column arrays of the table.
+
+        Returns:
+            dict: "sample", "method" and "params" string arrays and the
+            (rows x metrics) float "values" array.
+        """
+        if self._cache is None:
+            self._cache = {
+                "sample": np.array(self._sample, dtype=str),
+                "method": np.array(self._method, dtype=str),
+                "params": np.array(self._params, dtype=str),
+                "values": np.array(self._values, dtype=float).reshape(
+                    -1, len(METRIC_NAMES)
+                ),
+            }
+        return self._cache
+
+    def save(self, path):
+        """
+        Write the table to a single NPZ file.
+
+        Parameters:
+            path (str): Output file path.
+        """
+        np.savez(path, columns=np.array(METRIC_NAMES), **self.arrays())
+
+    @classmethod
+    def load(cls, path):
+        """
+        Read a table written by save.
+
+        Parameters:
+            path (str): NPZ file path.
+
+        Returns:
+            MetricsTable: Loaded table.
+        """
+        with np.load(path) as data:
+            columns = tuple(data["columns"].tolist())
+            if columns != METRIC_NAMES:
+                raise ValueError(f"unexpected metric columns {columns}")
+            table = cls()
+            table._cache = {
+                k: data[k] for k in ("sample", "method", "params", "values")
+            }
+        table._sample = table._cache["sample"].tolist()
+        table._method = table._cache["method"].tolist()
+        table._params = table._cache["params"].tolist()
+        table._values = table._cache["values"].tolist()
+        return table
+
+    def groups(self):
+        """
+        Distinct (method, params) pairs in order of first appearance.
+
+        Returns:
+            tuple: List of (method, params) pairs and the group index of each
+            row.
+        """
+        arrays = self.arrays()
+        keys = np.char.add(np.char.add(arrays["method"], "\x1f"), arrays["params"])
+        _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+
+        # Renumber groups by first appearance
+        order = np.argsort(first)
+        relabel = np.empty_like(order)
+        relabel[order] = np.arange(len(order))
+        pairs = [
+            (str(arrays["method"][first[i]]), str(arrays["params"][first[i]]))
+            for i in order
+        ]
+        return pairs, relabel[inverse.ravel()]
+
+    def pivot(self, metric, params=None):
+        """
+        Arrange one metric as a (samples x methods) matrix.
+
+        Parameters:
+            metric (str): Metric name.
+            params (str or None): Keep only this parameter set. Required when
+                a method was run with several parameter sets.
+
+        Returns:
+            tuple: Sample names, method names and the metric matrix (NaN where
+            a method has no value for a sample).
+        """
+        arrays = self.arrays()
+        mask = np.ones(len(self), dtype=bool)
+        if params is not None:
+            mask &= arrays["params"] == params
+        sample = arrays["sample"][mask]
+        method = arrays["method"][mask]
+        values = arrays["values"][mask, METRIC_NAMES.index(metric)]
+
+        samples, s_idx = np.unique(sample, return_inverse=True)
+        methods, m_first, m_idx = np.unique(
+            method, return_index=True, return_inverse=True
+        )
+
+        # Duplicate cells mean several parameter sets were mixed
+        cell = s_idx.ravel() * len(methods) + m_idx.ravel()
+        if len(np.unique(cell)) != len(cell):
+            raise ValueError("several parameter sets per method, pass params")
+
+        mat = np.full((len(samples), len(methods)), np.nan)
+        mat[s_idx.ravel(), m_idx.ravel()] = values
+
+        # Keep methods in order of first appearance
+        order = np.argsort(m_first)
+        return samples.tolist(), methods[order].tolist(), mat[:, order]
+
+    def summary(self, z=1.96):
+        """
+        Aggregate every metric per method and parameter set, ignoring NaNs.
+
+        Parameters:
+            z (float): Normal quantile for the confidence interval of the mean
+                (1.96 for 95%).
+
+        Returns:
+            dict: Maps (method, params) to a dictionary per metric with "n",
+            "mean", "std" (population, as np.nanstd), and "ci_low"/"ci_high"
+            computed from the sample standard error.
+        """
+        pairs, group = self.groups()
+        values = self.arrays()["values"]
+        valid = ~np.isnan(values)
+        filled = np.where(valid, values, 0.0)
+
+        # Grouped counts, sums and sums of squares for all metrics at once
+        n_groups = len(pairs)
+        n = np.zeros((n_groups, len(METRIC_NAMES)))
+        s = np.zeros_like(n)
+        ss = np.zeros_like(n)
+        np.add.at(n, group, valid)
+        np.add.at(s, group, filled)
+        np.add.at(ss, group, filled**2)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = s / n
+            var = np.maximum(ss / n - mean**2, 0.0)
+            std = np.sqrt(var)
+            sem = np.sqrt(var / (n - 1))
+        sem[n <= 1] = np.nan
+
+        result = {}
+        for g, pair in enumerate(pairs):
+            result[pair] = {
+                name: {
+                    "n": int(n[g, k]),
+                    "mean": mean[g, k],
+                    "std": std[g, k],
+                    "ci_low": mean[g, k] - z * sem[g, k],
+                    "ci_high": mean[g, k] + z * sem[g, k],
+                }
+                for k, name in enumerate(METRIC_NAMES)
+            }
+        return result
+
+    def rank(self, metric=None):
+        """
+        Rank methods and parameter sets by their mean metric values.
+
+        Parameters:
+            metric (str or None): Rank by this metric only. If None, rank by
+                the average rank over all metrics.
+
+        Returns:
+            list: (method, params, score) tuples, best first. The score is the
+            mean metric value or the average rank.
+        """
+        summary = self.summary()
+        pairs = list(summary)
+        names = METRIC_NAMES if metric is None else (metric,)
+
+        # Rank each metric so that 1 is best, NaN means go last
+        ranks = []
+        for name in names:
+            means = np.array([summary[p][name]["mean"] for p in pairs])
+            key = means if name in LOWER_IS_BETTER else -means
+            key = np.where(np.isnan(key), np.inf, key)
+            ranks.append(np.argsort(np.argsort(key, kind="stable")) + 1)
+
+        if metric is None:
+            score = np.mean(ranks, axis=0)
+        else:
+            score = np.array([summary[p][metric]["mean"] for p in pairs])
+        order = np.argsort(np.mean(ranks, axis=0), kind="stable")
+        return [(pairs[i][0], pairs[i][1], float(score[i])) for i in order]
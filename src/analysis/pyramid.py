@@ -0,0 +1,148 @@
+import numpy as np
+
+
+def build_pyramid(sig, t0, fs, factor=4, min_len=512):
+    """
+    Build a min/max decimation pyramid of a signal for fast plotting.
+
+    Level 0 holds the signal itself and every further level holds the minimum
+    and maximum of blocks of factor samples of the previous level, until a
+    level has fewer than min_len blocks.
+
+    Parameters:
+        sig (array): Signal values.
+        t0 (float): Time of the first sample.
+        fs (float): Sampling frequency (Hz).
+        factor (int): Decimation factor between consecutive levels.
+        min_len (int): Minimum number of blocks of the coarsest level.
+
+    Returns:
+        dict: Pyramid with "t0", "fs", "factor", "n" and the "lo" and "hi"
+        lists of arrays, one per level.
+    """
+    sig = np.asarray(sig, dtype=float)
+    lo, hi = [sig], [sig]
+
+    # Reduce each level in blocks, padding the tail with its edge values
+    while len(lo[-1]) // factor >= min_len:
+        prev_lo, prev_hi = lo[-1], hi[-1]
+        pad = -len(prev_lo) % factor
+        prev_lo = np.pad(prev_lo, (0, pad), mode="edge")
+        prev_hi = np.pad(prev_hi, (0, pad), mode="edge")
+        lo.append(prev_lo.reshape(-1, factor).min(axis=1))
+        hi.append(prev_hi.reshape(-1, factor).max(axis=1))
+
+    return {"t0": t0, "fs": fs, "factor": factor, "n": len(sig), "lo": lo, "hi": hi}
+
+
+def save_pyramid(path, pyr):
+    """
+    Write a pyramid to an NPZ file.
+
+    Parameters:
+        path (str): Output file path.
+        pyr (dict): Pyramid as returned by build_pyramid.
+    """
+    levels = {}
+    for k, (lo, hi) in enumerate(zip(pyr["lo"], pyr["hi"])):
+        levels[f"lo_{k}"] = lo
+        # Level 0 stores the signal once
+        if k > 0:
+            levels[f"hi_{k}"] = hi
+    np.savez(
+        path,
+        t0=pyr["t0"],
+        fs=pyr["fs"],
+        factor=pyr["factor"],
+        n=pyr["n"],
+        n_levels=len(pyr["lo"]),
+        **levels,
+    )
+
+
+def write_pyramid(path, sig, t0, fs, factor=4, min_len=512):
+    """
+    Build the pyramid of a signal and write it to an NPZ file.
+
+    Parameters:
+        path (str): Output file path.
+        sig (array): Signal values.
+        t0 (float): Time of the first sample.
+        fs (float): Sampling frequency (Hz).
+        factor (int): Decimation factor between consecutive levels.
+        min_len (int): Minimum number of blocks of the coarsest level.
+    """
+    save_pyramid(path, build_pyramid(sig, t0, fs, factor, min_len))
+
+
+def load_pyramid(path):
+    """
+    Read a pyramid written by save_pyramid.
+
+    Parameters:
+        path (str): NPZ file path.
+
+    Returns:
+        dict: Pyramid as returned by build_pyramid.
+    """
+    with np.load(path) as data:
+        n_levels = int(data["n_levels"])
+        lo = [data[f"lo_{k}"] for k in range(n_levels)]
+        hi = [lo[0]] + [data[f"hi_{k}"] for k in range(1, n_levels)]
+        return {
+            "t0": float(data["t0"]),
+            "fs": float(data["fs"]),
+            "factor": int(data["factor"]),
+            "n": int(data["n"]),
+            "lo": lo,
+            "hi": hi,
+        }
+
+
+def pyramid_view(pyr, start=None, stop=None, width=2000):
+    """
+    Select the points to draw for a time range at a given screen width.
+
+    The coarsest level that still has at least width blocks in the range is
+    used, and its minima and maxima are interleaved so a line plot keeps the
+    full envelope of the signal.
+
+    Parameters:
+        pyr (dict): Pyramid as returned by build_pyramid.
+        start (float or None): Start time (s), defaults to the first sample.
+        stop (float or None): Stop time (s), defaults to the last sample.
+        width (int): Approximate number of horizontal pixels.
+
+    Returns:
+        tuple: Time points and values to plot.
+
+    Raises:
+        ValueError: If the time range holds no sample of the signal.
+    """
+    t0, fs, factor = pyr["t0"], pyr["fs"], pyr["factor"]
+
+    # Sample range covered by the requested times
+    i0 = 0 if start is None else max(int(np.floor((start - t0) * fs)), 0)
+    i1 = pyr["n"] if stop is None else min(int(np.ceil((stop - t0) * fs)) + 1, pyr["n"])
+    if i0 >= i1:
+        t_end = t0 + (pyr["n"] - 1) / fs
+        raise ValueError(
+            f"time range [{start}, {stop}] lies outside the signal [{t0}, {t_end}]"
+        )
+
+    # Pick the coarsest level with enough blocks for the screen width
+    level = 0
+    while level + 1 < len(pyr["lo"]) and (i1 - i0) // factor ** (level + 1) >= width:
+        level += 1
+
+    if level == 0:
+        idx = np.arange(i0, i1)
+        return t0 + idx / fs, pyr["lo"][0][i0:i1]
+
+    # Interleave minima and maxima, both placed at the block start time
+    block = factor**level
+    b0, b1 = i0 // block, -(-i1 // block)
+    lo = pyr["lo"][level][b0:b1]
+    hi = pyr["hi"][level][b0:b1]
+    t = t0 + np.arange(b0, b1) * block / fs
+    return np.repeat(t, 2), np.column_stack((lo, hi)).ravel()
@@ -0,0 +1,92 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from analysis.pyramid import load_pyramid, pyramid_view
+
+# Stages written by main.py under the pyramid root directory
+STAGES = (
+    "raw",
+    "custom_method/smoothed",
+    "custom_method/baseline",
+    "custom_method/filtered",
+    "hybrid_method/filtered",
+)
+
+
+def render_sample(
+    name, root, out_path, stages=STAGES, start=None, stop=None, width=2000, style=None
+):
+    """
+    Draw the pyramids of one sample, one panel per stage, at screen resolution.
+
+    Parameters:
+        name (str): Sample name (e.g. "sample_01").
+        root (str): Directory holding one pyramid subdirectory per stage.
+        out_path (str): Output image path.
+        stages (tuple): Stage subdirectories to draw.
+        start (float or None): Start time (s) of the range to draw.
+        stop (float or None): Stop time (s) of the range to draw.
+        width (int): Approximate number of horizontal pixels per panel.
+        style (str or None): Matplotlib style file to apply.
+
+    Returns:
+        str: The output image path.
+    """
+    # Import pyplot here, so it is loaded with the backend of the caller or of
+    # the worker process
+    import matplotlib.pyplot as plt
+
+    if style is not None:
+        plt.style.use(style)
+
+    # Define figure
+    fig, axes = plt.subplots(len(stages), 1, figsize=(14, 2.5 * len(stages)))
+    axes = [axes] if len(stages) == 1 else axes
+
+    for ax, stage in zip(axes, stages):
+        pyr = load_pyramid(os.path.join(root, stage, f"{name}.npz"))
+        t, y = pyramid_view(pyr, start, stop, width)
+        ax.plot(t, y, linewidth=0.8)
+        ax.set_title(f"{name}: {stage}")
+        ax.set_xlabel("Time (s)")
+        ax.set_ylabel("Signal Amplitude")
+        ax.set_xlim(t[0], t[-1])
+
+    # Adjust layout and save
+    fig.tight_layout()
+    fig.savefig(out_path, dpi=100)
+    plt.close(fig)
+
+    return out_path
+
+
+def _init_worker():
+    # Worker processes draw off-screen with the non-interactive backend
+    import matplotlib
+
+    matplotlib.use("Agg")
+
+
+def _render_job(job):
+    name, root, out_dir, kwargs = job
+    return render_sample(name, root, os.path.join(out_dir, f"{name}.png"), **kwargs)
+
+
+def render_cohort(names, root, out_dir, workers=None, **kwargs):
+    """
+    Draw every sample of a cohort in parallel worker processes.
+
+    Parameters:
+        names (list): Sample names.
+        root (str): Directory holding one pyramid subdirectory per stage.
+        out_dir (str): Output directory, one image per sample.
+        workers (int or None): Number of processes, defaults to the CPU count.
+        **kwargs: Keyword arguments passed to render_sample.
+
+    Returns:
+        list: Output image paths.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    jobs = [(name, root, out_dir, kwargs) for name in names]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        return list(pool.map(_render_job, jobs))
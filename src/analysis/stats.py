@@ -0,0 +1,120 @@
+import numpy as np
+
+from analysis.metrics_table import LOWER_IS_BETTER
+
+
+def bootstrap_ci(values, n_boot=10000, ci=0.95, seed=None):
+    """
+    Percentile bootstrap confidence interval of the mean, ignoring NaNs.
+
+    All resamples are drawn at once as a (n_boot x n) index matrix, and the
+    columns of a 2D input are resampled with the same indices so paired
+    structure between methods is kept.
+
+    Parameters:
+        values (array): Per-sample values, 1D or (samples x methods).
+        n_boot (int): Number of bootstrap resamples.
+        ci (float): Confidence level.
+        seed (int or None): Seed for the random generator.
+
+    Returns:
+        tuple: Mean, lower bound and upper bound (scalars or one per column).
+    """
+    values = np.asarray(values, dtype=float)
+    rng = np.random.default_rng(seed)
+
+    # Draw every bootstrap replicate at once and count how often each row is
+    # picked, so the resampled means reduce to a single matrix product
+    n = len(values)
+    idx = rng.integers(0, n, size=(n_boot, n))
+    offsets = np.arange(n_boot)[:, None] * n
+    counts = np.bincount((idx + offsets).ravel(), minlength=n_boot * n)
+    counts = counts.reshape(n_boot, n).astype(float)
+
+    valid = ~np.isnan(values)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        boot = (counts @ np.where(valid, values, 0.0)) / (counts @ valid)
+
+    alpha = (1 - ci) / 2
+    low, high = np.nanpercentile(boot, [100 * alpha, 100 * (1 - alpha)], axis=0)
+    return np.nanmean(values, axis=0), low, high
+
+
+def paired_permutation_test(a, b, n_perm=10000, alternative="two-sided", seed=None):
+    """
+    Paired sign-flip permutation test on the mean difference a - b.
+
+    Samples where either value is NaN are dropped. All sign flips are drawn at
+    once as a (n_perm x n) matrix.
+
+    Parameters:
+        a (array): Per-sample values of the first method.
+        b (array): Per-sample values of the second method.
+        n_perm (int): Number of random permutations.
+        alternative (str): "two-sided", "greater" (a > b) or "less" (a < b).
+        seed (int or None): Seed for the random generator.
+
+    Returns:
+        tuple: Observed mean difference and p-value.
+    """
+    diff = np.asarray(a, dtype=float) - np.asarray(b, dtype=float)
+    diff = diff[~np.isnan(diff)]
+    if len(diff) == 0:
+        return np.nan, np.nan
+
+    rng = np.random.default_rng(seed)
+
+    # Null distribution: random sign flips of the paired differences
+    signs = rng.choice(np.array([-1.0, 1.0]), size=(n_perm, len(diff)))
+    null = signs @ diff / len(diff)
+    observed = diff.mean()
+
+    if alternative == "two-sided":
+        extreme = np.abs(null) >= np.abs(observed)
+    elif alternative == "greater":
+        extreme = null >= observed
+    elif alternative == "less":
+        extreme = null <= observed
+    else:
+        raise ValueError(f"unknown alternative {alternative!r}")
+
+    # Count the observed statistic so the p-value is never zero
+    p_value = (np.count_nonzero(extreme) + 1) / (n_perm + 1)
+    return observed, p_value
+
+
+def compare_methods(table, metric, params=None, n_boot=10000, n_perm=10000, seed=None):
+    """
+    Bootstrap confidence intervals per method and paired permutation tests
+    between every pair of methods for one metric of a MetricsTable.
+
+    Parameters:
+        table (MetricsTable): Consolidated metrics of a run.
+        metric (str): Metric name.
+        params (str or None): Parameter set to compare, see MetricsTable.pivot.
+        n_boot (int): Number of bootstrap resamples.
+        n_perm (int): Number of permutations per test.
+        seed (int or None): Seed for the random generator.
+
+    Returns:
+        dict: "ci" maps each method to (mean, low, high), and "tests" maps each
+        (method_a, method_b) pair to (mean difference, p-value, better), where
+        better names the method with the better mean for this metric.
+    """
+    _, methods, values = table.pivot(metric, params)
+    mean, low, high = bootstrap_ci(values, n_boot=n_boot, seed=seed)
+
+    tests = {}
+    for i in range(len(methods)):
+        for j in range(i + 1, len(methods)):
+            diff, p_value = paired_permutation_test(
+                values[:, i], values[:, j], n_perm=n_perm, seed=seed
+            )
+            a_better = diff < 0 if metric in LOWER_IS_BETTER else diff > 0
+            better = methods[i] if a_better else methods[j]
+            tests[(methods[i], methods[j])] = (diff, p_value, better)
+
+    return {
+        "ci": {m: (mean[k], low[k], high[k]) for k, m in enumerate(methods)},
+        "tests": tests,
+    }
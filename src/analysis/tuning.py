@@ -0,0 +1,345 @@
+import hashlib
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy.io import loadmat
+
+from analysis.metrics import metrics
+from analysis.metrics_table import LOWER_IS_BETTER, METRIC_NAMES
+from processing.custom_method import custom_method
+from processing.ensemble import method_peaks
+from processing.hybrid_method import hybrid_method
+from processing.scipy_method import scipy_method
+from processing.signal import Events, Signal
+from storage.dataset import MatDataset
+
+# Objectives accepted by the tuner besides the metrics themselves
+OBJECTIVES = (*METRIC_NAMES, "f1")
+
+# Datasets and reference peaks opened by each worker process
+_DATASETS = {}
+_REFS = {}
+
+
+def sample_configs(space, n, seed=None):
+    """
+    Draw random parameter configurations from a search space.
+
+    Parameters:
+        space (dict): Parameter names mapped to a list of choices, a
+            (low, high) uniform range, or a (low, high, "log") log-uniform range.
+        n (int): Number of configurations.
+        seed (int or None): Random seed.
+
+    Returns:
+        list: Parameter dictionaries, values rounded to 6 significant digits.
+    """
+    rng = np.random.default_rng(seed)
+    configs = []
+    for _ in range(n):
+        config = {}
+        for name, spec in space.items():
+            if isinstance(spec, list):
+                value = spec[rng.integers(len(spec))]
+            elif len(spec) == 3 and spec[2] == "log":
+                value = math.exp(rng.uniform(math.log(spec[0]), math.log(spec[1])))
+            else:
+                value = rng.uniform(spec[0], spec[1])
+            if isinstance(value, (float, np.floating)):
+                value = float(f"{value:.6g}")
+            elif isinstance(value, np.integer):
+                value = int(value)
+            config[name] = value
+        configs.append(config)
+    return configs
+
+
+def trial_key(method, config, budget, fixed=None, tol=0.5):
+    """
+    Stable hash identifying a trial, used to resume from the trial log.
+
+    Parameters:
+        method (str): Method name ("scipy", "hybrid" or "custom").
+        config (dict): Tuned parameters.
+        budget (dict): Sample indices and signal length of the trial.
+        fixed (dict or None): Parameters kept constant.
+        tol (float): Tolerance for time matching.
+
+    Returns:
+        str: SHA-1 hex digest.
+    """
+    payload = json.dumps(
+        {
+            "method": method,
+            "config": config,
+            "budget": budget,
+            "fixed": fixed or {},
+            "tol": tol,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha1(payload.encode(), usedforsecurity=False).hexdigest()
+
+
+def score(met, objective):
+    """
+    Objective value of mean metrics, oriented so that higher is better.
+
+    Parameters:
+        met (dict): Mean metrics of a trial.
+        objective (str): Metric name or "f1" (harmonic mean of sensitivity and
+            specificity).
+
+    Returns:
+        float: Score, -inf if the metric is undefined.
+    """
+    if objective == "f1":
+        sens, spec = met["sensitivity"], met["specificity"]
+        value = 2 * sens * spec / (sens + spec) if sens + spec > 0 else 0.0
+    else:
+        value = met[objective]
+    if value is None or np.isnan(value):
+        return -np.inf
+    return -value if objective in LOWER_IS_BETTER else value
+
+
+class TrialLog:
+    """
+    Append-only JSONL log of evaluated trials, keyed by trial_key.
+
+    Parameters:
+        path (str or None): Log file. Existing trials are loaded, so an
+            interrupted search resumes without re-evaluating them. None keeps
+            the log in memory only.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self._trials = {}
+        if path is not None and os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        trial = json.loads(line)
+                        self._trials[trial["key"]] = trial
+
+    def __contains__(self, key):
+        return key in self._trials
+
+    def __getitem__(self, key):
+        return self._trials[key]
+
+    def __len__(self):
+        return len(self._trials)
+
+    def add(self, trial):
+        """Record a trial and append it to the log file."""
+        self._trials[trial["key"]] = trial
+        if self.path is not None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a") as f:
+                f.write(json.dumps(trial) + "\n")
+
+
+def halving_budgets(n_samples, length, rungs, eta=3, truncate=True, seed=None):
+    """
+    Budgets of the successive halving rungs.
+
+    Rung r uses a 1 / eta ** (rungs - 1 - r) share of the samples and, if
+    truncate is set, of the signal length. Sample subsets are nested, so the
+    last rung covers the full cohort at full length.
+
+    Parameters:
+        n_samples (int): Number of samples in the cohort.
+        length (int): Signal length (samples).
+        rungs (int): Number of rungs.
+        eta (int): Reduction factor between rungs.
+        truncate (bool): Also truncate the signals on the cheaper rungs.
+        seed (int or None): Seed of the sample order.
+
+    Returns:
+        list: One budget dictionary per rung, with "samples" (indices) and
+        "length" (samples per signal).
+    """
+    order = np.random.default_rng(seed).permutation(n_samples).tolist()
+    budgets = []
+    for r in range(rungs):
+        share = eta ** (rungs - 1 - r)
+        budgets.append(
+            {
+                "samples": sorted(order[: max(1, math.ceil(n_samples / share))]),
+                "length": math.ceil(length / share) if truncate else length,
+            }
+        )
+    return budgets
+
+
+def evaluate(method, config, budget, data_path, fixed=None, ref_path=None, tol=0.5):
+    """
+    Run one method on a budget of the cohort and average its metrics.
+
+    Parameters:
+        method (str): Method name ("scipy", "hybrid" or "custom").
+        config (dict): Tuned parameters.
+        budget (dict): "samples" indices and signal "length".
+        data_path (str): MAT file of the cohort.
+        fixed (dict or None): Parameters kept constant.
+        ref_path (str or None): MAT file of the reference peak (hybrid method).
+        tol (float): Tolerance for time matching.
+
+    Returns:
+        dict: Mean of each metric over the samples, NaNs ignored.
+    """
+    # Open the dataset once per process
+    if data_path not in _DATASETS:
+        _DATASETS[data_path] = MatDataset(data_path)
+    dataset = _DATASETS[data_path]
+    params = {**(fixed or {}), **config}
+
+    values = []
+    for i in budget["samples"]:
+        # Truncate the signal and its ground truth to the budget length
+        sample = dataset.read(i)
+        raw = sample["raw"]
+        raw = Signal(raw.samples[: budget["length"]], raw.fs, raw.t0)
+        gt = sample["gt"].events()
+        keep = gt.index < budget["length"]
+        gt = Events(gt.index[keep], gt.amplitude[keep], gt.fs, gt.t0)
+
+        # Detect peaks
+        if method == "scipy":
+            result = scipy_method(raw, None, gt, **params)
+        elif method == "hybrid":
+            if ref_path not in _REFS:
+                _REFS[ref_path] = loadmat(ref_path)["xref"].flatten()
+            result = hybrid_method(raw, None, _REFS[ref_path], **params)
+        elif method == "custom":
+            result = custom_method(raw, None, **params)
+        else:
+            raise ValueError(f"unknown method {method!r}")
+        peak_t, peak_v = method_peaks(method, result)
+
+        # Score against the ground truth
+        met = metrics(gt, None, np.asarray(peak_t), np.asarray(peak_v), tol)
+        values.append([met[k] for k in METRIC_NAMES])
+
+    values = np.array(values, dtype=float)
+    means = {}
+    for j, name in enumerate(METRIC_NAMES):
+        column = values[:, j][~np.isnan(values[:, j])]
+        means[name] = float(column.mean()) if len(column) else None
+    return means
+
+
+def _evaluate_job(job):
+    # Unpack arguments for the worker pool
+    key, args = job
+    start = time.perf_counter()
+    means = evaluate(*args)
+    return key, means, time.perf_counter() - start
+
+
+def successive_halving(
+    method,
+    space,
+    data_path,
+    n_configs=27,
+    eta=3,
+    rungs=3,
+    objective="f1",
+    fixed=None,
+    ref_path=None,
+    tol=0.5,
+    truncate=True,
+    workers=None,
+    log_path=None,
+    seed=0,
+):
+    """
+    Tune the parameters of a method with successive halving.
+
+    All candidates are first scored on a small share of the cohort, and only
+    the best 1 / eta of them move on to the next, eta times larger, budget, so
+    the full cohort is only processed for the most promising configurations.
+    Each rung is evaluated in a process pool, and every trial is appended to a
+    JSONL log so an interrupted search resumes where it stopped.
+
+    Parameters:
+        method (str): Method name ("scipy", "hybrid" or "custom").
+        space (dict): Search space, see sample_configs.
+        data_path (str): MAT file of the cohort.
+        n_configs (int): Number of candidates in the first rung.
+        eta (int): Reduction factor between rungs.
+        rungs (int): Number of rungs.
+        objective (str): Objective to optimize, one of OBJECTIVES.
+        fixed (dict or None): Parameters kept constant.
+        ref_path (str or None): MAT file of the reference peak (hybrid method).
+        tol (float): Tolerance for time matching.
+        truncate (bool): Also truncate the signals on the cheaper rungs.
+        workers (int or None): Number of worker processes.
+        log_path (str or None): JSONL trial log.
+        seed (int): Seed of the candidates and sample subsets.
+
+    Returns:
+        dict: "config" and "score" of the best candidate on the last rung, and
+        "trials", every trial of the search in evaluation order.
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"objective must be one of {OBJECTIVES}")
+
+    # Cohort size and signal length
+    with MatDataset(data_path) as dataset:
+        n_samples = len(dataset)
+        length = len(dataset.read(0, with_gt=False)["raw"])
+
+    budgets = halving_budgets(n_samples, length, rungs, eta, truncate, seed)
+    candidates = sample_configs(space, n_configs, seed)
+    log = TrialLog(log_path)
+    trials = []
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for rung, budget in enumerate(budgets):
+            keys = [trial_key(method, c, budget, fixed, tol) for c in candidates]
+
+            # Evaluate the candidates missing from the log
+            pending = {
+                key: config for key, config in zip(keys, candidates) if key not in log
+            }
+            jobs = [
+                (key, (method, config, budget, data_path, fixed, ref_path, tol))
+                for key, config in pending.items()
+            ]
+            for key, means, elapsed in pool.map(_evaluate_job, jobs):
+                log.add(
+                    {
+                        "key": key,
+                        "method": method,
+                        "config": pending[key],
+                        "rung": rung,
+                        "n_samples": len(budget["samples"]),
+                        "length": budget["length"],
+                        "metrics": means,
+                        "seconds": elapsed,
+                    }
+                )
+
+            # Keep the best 1 / eta of the candidates for the next rung
+            scores = [score(log[key]["metrics"], objective) for key in keys]
+            trials.extend(log[key] for key in keys)
+            order = np.argsort(-np.array(scores), kind="stable")
+            if rung < len(budgets) - 1:
+                keep = max(1, math.ceil(len(candidates) / eta))
+                candidates = [candidates[i] for i in order[:keep]]
+            else:
+                best = int(order[0])
+
+    return {
+        "config": candidates[best],
+        "score": scores[best],
+        "trials": trials,
+    }
@@ -0,0 +1,61 @@
+# Run from src/ with: python -m benchmarks.baseline_benchmark
+
+import time
+
+import numpy as np
+
+from analysis.metrics import metrics
+from processing.custom_method import custom_method
+from storage.dataset import MatDataset
+
+# Sampling frequency (Hz)
+fs = 10
+
+# Custom method parameters shared by all baselines
+custom_params = {
+    "win_len": 151,
+    "poly_order": 3,
+    "lam": 1e8,
+    "pen": 0.001,
+    "max_iter": 50,
+    "th": 0.1,
+}
+
+# Baselines to compare, with their extra parameters
+baselines = {
+    "als": {},
+    "arpls": {},
+    "airpls": {},
+    "morph": {"win_len": 1201},
+    "percentile": {"win_len": 1201, "q": 10},
+}
+
+# Load all samples once, so only the detection is timed
+with MatDataset("../data/signals/raw/data.mat", fs=fs) as dataset:
+    samples = [(sig["raw"], sig["gt"].events()) for _, sig in dataset]
+
+print(f"{'baseline':<12}{'time (s)':>10}{'sens':>8}{'spec':>8}{'t_acc':>8}{'mae':>8}")
+for baseline, baseline_params in baselines.items():
+    elapsed = 0.0
+    values = []
+    for raw, gt in samples:
+        # Time the full custom method with this baseline
+        start = time.perf_counter()
+        _, _, _, peak_t, peak_v = custom_method(
+            raw,
+            None,
+            **custom_params,
+            baseline=baseline,
+            baseline_params=baseline_params,
+        )
+        elapsed += time.perf_counter() - start
+
+        # Score the detections
+        met = metrics(gt, None, np.asarray(peak_t), np.asarray(peak_v), tol=0.5)
+        values.append(list(met.values()))
+
+    # Report total time and mean metrics over the cohort
+    sens, spec, t_acc, mae = np.nanmean(np.array(values, dtype=float), axis=0)
+    print(
+        f"{baseline:<12}{elapsed:>10.2f}{sens:>8.3f}{spec:>8.3f}{t_acc:>8.3f}{mae:>8.3f}"
+    )
@@ -0,0 +1,57 @@
+# Run from src/ with: python -m benchmarks.import_time
+
+import re
+import subprocess
+import sys
+
+# Modules timed, each in a fresh interpreter
+modules = [
+    "processing",
+    "processing.signal",
+    "processing.scipy_method",
+    "processing.hybrid_method",
+    "processing.custom_method",
+    "processing.ensemble",
+    "processing.batch",
+    "processing.streaming",
+    "storage.dataset",
+    "pipeline",
+]
+
+# Repeats per module, the fastest run is kept
+repeats = 5
+
+# Lines of -X importtime: "import time: self [us] | cumulative | name"
+line_re = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s*(\S+)")
+
+
+def import_times(module):
+    # Self import time of one import, summed by top-level package (ms)
+    # The command runs this interpreter on module names fixed in this script
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        match = line_re.match(line)
+        if match:
+            package = match.group(3).split(".")[0]
+            times[package] = times.get(package, 0) + int(match.group(1)) / 1000
+    return times
+
+
+print(f"{'module':<28}{'total (ms)':>12}{'numpy':>8}{'scipy':>8}  slowest packages")
+for module in modules:
+    runs = [import_times(module) for _ in range(repeats)]
+    times = min(runs, key=lambda t: sum(t.values()))
+
+    total = sum(times.values())
+    slowest = sorted(times.items(), key=lambda kv: kv[1], reverse=True)[:3]
+    names = ", ".join(f"{k} {v:.0f}" for k, v in slowest)
+    print(
+        f"{module:<28}{total:>12.1f}{times.get('numpy', 0):>8.1f}"
+        f"{times.get('scipy', 0):>8.1f}  {names}"
+    )
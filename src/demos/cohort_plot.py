@@ -0,0 +1,20 @@
+from analysis.render import render_cohort
+
+# Define samples, pyramid root and style
+names = [f"sample_{i:02d}" for i in range(1, 26)]
+pyramid_root = "../data/signals/pyramids/"
+style = "../../config/matplotlib/mhedas.mplstyle"
+
+if __name__ == "__main__":
+    # Full-length view of every sample, drawn in parallel
+    render_cohort(names, pyramid_root, "../images/cohort/", style=style)
+
+    # Zoomed view of the same samples between 1000 s and 1500 s
+    render_cohort(
+        names,
+        pyramid_root,
+        "../images/cohort/zoom/",
+        start=1000,
+        stop=1500,
+        style=style,
+    )
@@ -1,39 +1,39 @@
 import matplotlib.pyplot as plt
-import numpy as np
+
+from analysis.pyramid import load_pyramid, pyramid_view
+from storage.events import EventTable
 
 # Use custom style
 plt.style.use("../../config/matplotlib/mhedas.mplstyle")
 
 # File paths
-raw_file_path = "../data/signals/raw/sample_01.txt"
-ground_truth_file_path = "../data/signals/ground_truth/sample_01.txt"
-smoothed_file_path = "../data/signals/custom_method/smoothed/sample_01.txt"
-baseline_corrected_file_path = "../data/signals/custom_method/baseline/sample_01.txt"
-filtered_file_path = "../data/signals/custom_method/filtered/sample_01.txt"
-custom_peaks_file_path = "../data/peaks/custom_peaks/sample_01.txt"
-
-# Load raw signal data
-raw_data = np.loadtxt(raw_file_path, delimiter=",")
-t = raw_data[:, 0]
-signal = raw_data[:, 1]
-
-# Load ground truth signal data
-ground_truth_data = np.loadtxt(ground_truth_file_path, delimiter=",")
-gt_sig = ground_truth_data[:, 1]
+pyramid_root = "../data/signals/pyramids"
+raw_file_path = f"{pyramid_root}/raw/sample_01.npz"
+ground_truth_file_path = "../data/signals/ground_truth/ground_truth.npz"
+smoothed_file_path = f"{pyramid_root}/custom_method/smoothed/sample_01.npz"
+baseline_corrected_file_path = f"{pyramid_root}/custom_method/baseline/sample_01.npz"
+filtered_file_path = f"{pyramid_root}/custom_method/filtered/sample_01.npz"
+custom_peaks_file_path = "../data/peaks/custom_peaks.npz"
+
+# Load the raw signal envelope at screen resolution
+t, signal = pyramid_view(load_pyramid(raw_file_path))
+
+# Load ground truth peaks
+gt = EventTable.load(ground_truth_file_path)["sample_01"]
 
 # Load smoothed signal
-smoothed_sig = np.loadtxt(smoothed_file_path, delimiter=",")[:, 1]
+smoothed_sig = pyramid_view(load_pyramid(smoothed_file_path))[1]
 
 # Load baseline signal
-baseline_sig = np.loadtxt(baseline_corrected_file_path, delimiter=",")[:, 1]
+baseline_sig = pyramid_view(load_pyramid(baseline_corrected_file_path))[1]
 
 # Load filtered signal
-filtered_sig = np.loadtxt(filtered_file_path, delimiter=",")[:, 1]
+filtered_sig = pyramid_view(load_pyramid(filtered_file_path))[1]
 
 # Load custom peaks
-custom_peaks = np.loadtxt(custom_peaks_file_path, delimiter=",")
-peak_t = custom_peaks[:, 0]
-peak_v = custom_peaks[:, 1]
+custom_peaks = EventTable.load(custom_peaks_file_path)["sample_01"]
+peak_t = custom_peaks.t
+peak_v = custom_peaks.amplitude
 
 # Define figure
 fig, axes = plt.subplots(2, 2, figsize=(14, 10))
@@ -66,8 +66,8 @@ axes[1, 0].legend()
 
 # Ground truth and custom peaks
 axes[1, 1].stem(
-    t[gt_sig > 0],
-    gt_sig[gt_sig > 0],
+    gt.t,
+    gt.amplitude,
     linefmt="orange",
     markerfmt="o",
     basefmt=" ",
@@ -1,45 +1,44 @@
 import matplotlib.pyplot as plt
 import numpy as np
 
+from analysis.pyramid import build_pyramid, load_pyramid, pyramid_view
+from storage.events import EventTable
+
 # Use custom style
 plt.style.use("../../config/matplotlib/mhedas.mplstyle")
 
 # File paths
-raw_file_path = "../data/signals/raw/sample_01.txt"
-ground_truth_file_path = "../data/signals/ground_truth/sample_01.txt"
-filtered_file_path = "../data/signals/hybrid_method/filtered/sample_01.txt"
+raw_file_path = "../data/signals/pyramids/raw/sample_01.npz"
+ground_truth_file_path = "../data/signals/ground_truth/ground_truth.npz"
+filtered_file_path = "../data/signals/pyramids/hybrid_method/filtered/sample_01.npz"
 convolved_file_path = "../data/signals/hybrid_method/convolved/sample_01.txt"
-hybrid_peaks_file_path = "../data/peaks/hybrid_peaks/sample_01.txt"
-
+hybrid_peaks_file_path = "../data/peaks/hybrid_peaks.npz"
 
-# Load raw signal data
-raw_data = np.loadtxt(raw_file_path, delimiter=",")
-t = raw_data[:, 0]
-signal = raw_data[:, 1]
 
-# Load ground truth signal data
-ground_truth_data = np.loadtxt(ground_truth_file_path, delimiter=",")
-gt_t = ground_truth_data[:, 0]
-gt_sig = ground_truth_data[:, 1]
+# Load raw signal data, the full signal for the PSD and its envelope at screen
+# resolution for the time plot
+raw = load_pyramid(raw_file_path)
+t, signal = pyramid_view(raw)
 
-# Extract ground truth times
-gt_t = t[np.where(gt_sig > 0)]
+# Load ground truth peaks
+gt = EventTable.load(ground_truth_file_path)["sample_01"]
 
 # Load hybrid filtered signal
-filtered_sig = np.loadtxt(filtered_file_path, delimiter=",")[:, 1]
+filtered_sig = pyramid_view(load_pyramid(filtered_file_path))[1]
 
-# Load convolved signal
+# Load convolved signal and reduce it to its envelope, on a sample axis
 conv_sig = np.loadtxt(convolved_file_path)
 height = np.max(conv_sig) * 0.01
+conv_n, conv_sig = pyramid_view(build_pyramid(conv_sig, 0, 1))
 
 # Load hybrid peaks
-hybrid_peaks = np.loadtxt(hybrid_peaks_file_path, delimiter=",")
-peak_t = hybrid_peaks[:, 0]
-peak_v = hybrid_peaks[:, 1]
+hybrid_peaks = EventTable.load(hybrid_peaks_file_path)["sample_01"]
+peak_t = hybrid_peaks.t
+peak_v = hybrid_peaks.amplitude
 
 # Compute Power Spectral Density (PSD)
-freqs = np.fft.rfftfreq(len(signal), d=np.mean(np.diff(t)))
-psd = np.abs(np.fft.rfft(signal)) ** 2
+freqs = np.fft.rfftfreq(raw["n"], d=1 / raw["fs"])
+psd = np.abs(np.fft.rfft(raw["lo"][0])) ** 2
 
 # Define figure
 fig = plt.figure(figsize=(14, 10))
@@ -67,18 +66,18 @@ ax2.set_xlim(min(t), max(t))
 ax2.legend()
 
 # Convolved signal
-ax3.plot(conv_sig, label="Convolved Signal")
+ax3.plot(conv_n, conv_sig, label="Convolved Signal")
 ax3.axhline(y=height, color="black", linestyle="--", label="Threshold")
 ax3.set_title("Convolved Signal")
 ax3.set_xlabel("Sample")
 ax3.set_ylabel("Signal Amplitude")
-ax3.set_xlim(0, len(conv_sig) - 1)
+ax3.set_xlim(conv_n[0], conv_n[-1])
 ax3.legend()
 
 # Ground Truth and Detected Peaks
 ax4.stem(
-    gt_t,
-    gt_sig[gt_sig > 0],
+    gt.t,
+    gt.amplitude,
     linefmt="orange",
     markerfmt="o",
     basefmt=" ",
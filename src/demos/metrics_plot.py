@@ -1,45 +1,30 @@
-import os
-
 import matplotlib.pyplot as plt
-import numpy as np
+
+from analysis.metrics_table import MetricsTable
+from analysis.stats import compare_methods
 
 # Use custom style
 plt.style.use("../../config/matplotlib/mhedas.mplstyle")
 
-# Define directories and metrics
-metrics_dirs = {
-    "custom_metrics": "../data/metrics/custom_metrics/",
-    "scipy_metrics": "../data/metrics/scipy_metrics/",
-    "hybrid_metrics": "../data/metrics/hybrid_metrics/",
-}
-
-metrics_dicts = {
-    "custom_metrics": {
-        key: []
-        for key in ["sensitivity", "specificity", "time_accuracy", "mae_intensity"]
-    },
-    "scipy_metrics": {
-        key: []
-        for key in ["sensitivity", "specificity", "time_accuracy", "mae_intensity"]
-    },
-    "hybrid_metrics": {
-        key: []
-        for key in ["sensitivity", "specificity", "time_accuracy", "mae_intensity"]
-    },
-}
+# Load the consolidated metrics table of the run
+table = MetricsTable.load("../data/metrics/metrics.npz")
+summary = table.summary()
+params = {method: p for method, p in summary}
 
 titles = ["Sensitivity", "Specificity", "Time Accuracy", "MAE Intensity"]
 
-# Load all metrics
-for metric_type, metric_dir in metrics_dirs.items():
-    for file_name in sorted(os.listdir(metric_dir)):
-        if file_name.endswith(".txt"):
-            file_path = os.path.join(metric_dir, file_name)
-            data = np.loadtxt(file_path, delimiter=",", skiprows=1)
-            if data.ndim == 1:
-                data = data.reshape(1, -1)
-            for i, key in enumerate(metrics_dicts[metric_type].keys()):
-                metrics_dicts[metric_type][key].append(data[0, i])
+# Print overall ranking of the methods
+for position, (method, _, score) in enumerate(table.rank(), start=1):
+    print(f"{position}. {method} (mean rank {score:.2f})")
+
+# Print bootstrap confidence intervals and paired permutation tests
+for metric in ["sensitivity", "specificity", "time_accuracy", "mae_intensity"]:
+    comparison = compare_methods(table, metric, seed=0)
+    print(f"\n{metric}")
+    for method, (mean, low, high) in comparison["ci"].items():
+        print(f"  {method}: {mean:.3f} [95% CI {low:.3f}, {high:.3f}]")
+    for (a, b), (diff, p_value, better) in comparison["tests"].items():
+        print(f"  {a} vs {b}: diff {diff:+.3f}, p = {p_value:.4f} ({better})")
 
 # Define metrics figure
 fig_metrics, axes = plt.subplots(2, 2, figsize=(14, 10))
@@ -51,17 +36,18 @@ for i, metric in enumerate(
 ):
     # Extract values
     ax = axes[i]
-    values_custom = metrics_dicts["custom_metrics"][metric]
-    values_scipy = metrics_dicts["scipy_metrics"][metric]
-    values_hybrid = metrics_dicts["hybrid_metrics"][metric]
-
-    # Compute mean and standard deviation
-    mean_custom = np.nanmean(values_custom)
-    std_custom = np.nanstd(values_custom)
-    mean_scipy = np.nanmean(values_scipy)
-    std_scipy = np.nanstd(values_scipy)
-    mean_hybrid = np.nanmean(values_hybrid)
-    std_hybrid = np.nanstd(values_hybrid)
+    _, methods, values = table.pivot(metric)
+    values_custom = values[:, methods.index("custom")]
+    values_scipy = values[:, methods.index("scipy")]
+    values_hybrid = values[:, methods.index("hybrid")]
+
+    # Extract mean and standard deviation
+    stats_custom = summary[("custom", params["custom"])][metric]
+    stats_scipy = summary[("scipy", params["scipy"])][metric]
+    stats_hybrid = summary[("hybrid", params["hybrid"])][metric]
+    mean_custom, std_custom = stats_custom["mean"], stats_custom["std"]
+    mean_scipy, std_scipy = stats_scipy["mean"], stats_scipy["std"]
+    mean_hybrid, std_hybrid = stats_hybrid["mean"], stats_hybrid["std"]
 
     # Define x-values
     x_values = range(1, len(values_custom) + 1)
@@ -1,24 +1,24 @@
 import matplotlib.pyplot as plt
-import numpy as np
 from scipy.io import loadmat
 
+from analysis.pyramid import build_pyramid, load_pyramid, pyramid_view
+from storage.events import EventTable
+
 # Use custom style
 plt.style.use("../../config/matplotlib/mhedas.mplstyle")
 
 # File paths
-raw_path = "../data/signals/raw/sample_01.txt"
-ground_truth_path = "../data/signals/ground_truth/sample_01.txt"
+raw_path = "../data/signals/pyramids/raw/sample_01.npz"
+ground_truth_path = "../data/signals/ground_truth/ground_truth.npz"
 ref_peak_path = "../data/signals/ref_peak.mat"
 
-# Load raw signal data
-raw_data = np.loadtxt(raw_path, delimiter=",")
-t = raw_data[:, 0]
-signal = raw_data[:, 1]
+# Load the raw signal envelope at screen resolution
+raw = load_pyramid(raw_path)
+t, signal = pyramid_view(raw)
 
-# Load ground truth signal data
-ground_truth_data = np.loadtxt(ground_truth_path, delimiter=",")
-gt_t = ground_truth_data[:, 0]
-gt_sig = ground_truth_data[:, 1]
+# Load ground truth peaks as a dense signal, reduced the same way
+gt_sig = EventTable.load(ground_truth_path).to_dense("sample_01", raw["n"])
+gt_t, gt_sig = pyramid_view(build_pyramid(gt_sig, raw["t0"], raw["fs"]))
 
 # Load reference peak data
 ref_peak_data = loadmat(ref_peak_path)
@@ -2,25 +2,33 @@ import matplotlib.pyplot as plt
 import numpy as np
 from scipy.signal import find_peaks
 
+from analysis.pyramid import build_pyramid, load_pyramid, pyramid_view
+from processing.signal import Signal
+from storage.events import EventTable
+
 # Use custom style
 plt.style.use("../../config/matplotlib/mhedas.mplstyle")
 
 # File paths
-raw_file_path = "../data/signals/raw/sample_03.txt"
-ground_truth_file_path = "../data/signals/ground_truth/sample_03.txt"
-
-# Load raw signal data
-raw_data = np.loadtxt(raw_file_path, delimiter=",")
-t = raw_data[:, 0]
-signal = raw_data[:, 1]
-
-# Load ground truth signal data
-ground_truth_data = np.loadtxt(ground_truth_file_path, delimiter=",")
-gt_t = ground_truth_data[:, 0]
-gt_sig = ground_truth_data[:, 1]
+raw_file_path = "../data/signals/pyramids/raw/sample_03.npz"
+ground_truth_file_path = "../data/signals/ground_truth/ground_truth.npz"
+
+# Load raw signal data, the full signal for the detection and its pyramid for
+# drawing the demo window
+raw_pyr = load_pyramid(raw_file_path)
+raw = Signal(raw_pyr["lo"][0], raw_pyr["fs"], raw_pyr["t0"])
+t = raw.t
+signal = raw.samples
+
+# Load ground truth peaks and rebuild the dense signal for the window plot
+gt_table = EventTable.load(ground_truth_file_path)
+gt = gt_table["sample_03"]
+gt_pyr = build_pyramid(
+    gt_table.to_dense("sample_03", len(signal)), raw_pyr["t0"], raw_pyr["fs"]
+)
 
 # Extract ground truth times
-gt_t = t[np.where(gt_sig > 0)]
+gt_t = t[gt.index]
 
 # Define parameters
 fs = 10
@@ -75,11 +83,10 @@ for i in range(num_windows):
 
     # If iteration is on the selected window
     if i == demo_window_idx:
-        # Window plot
-        axes[0].plot(win_t, win_sig, label="Raw Signal")
+        # Window plot, drawn from the envelopes at screen resolution
+        axes[0].plot(*pyramid_view(raw_pyr, win_t[0], win_t[-1]), label="Raw Signal")
         axes[0].plot(
-            win_t,
-            gt_sig[start_idx:end_idx],
+            *pyramid_view(gt_pyr, win_t[0], win_t[-1]),
             label="Ground Truth Signal",
             linestyle="--",
         )
@@ -94,8 +101,8 @@ for i in range(num_windows):
 
 # Ground truth and SciPy detected peaks
 axes[1].stem(
-    t[gt_sig > 0],
-    gt_sig[gt_sig > 0],
+    gt_t,
+    gt.amplitude,
     linefmt="orange",
     markerfmt="o",
     basefmt=" ",
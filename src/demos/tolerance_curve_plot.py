@@ -0,0 +1,63 @@
+import matplotlib.pyplot as plt
+import numpy as np
+
+from analysis.metrics import metrics_curve
+from storage.events import EventTable
+
+# Use custom style
+plt.style.use("../../config/matplotlib/mhedas.mplstyle")
+
+# Define methods, samples and tolerances
+methods = {
+    "custom": "red",
+    "scipy": "blue",
+    "hybrid": "green",
+    "consensus": "purple",
+}
+samples = [f"sample_{i:02d}" for i in range(1, 26)]
+tols = np.linspace(0, 2, 41)
+
+# Define figure
+fig, axes = plt.subplots(1, 2, figsize=(14, 6))
+
+# Load ground truth peaks of all samples
+gt_table = EventTable.load("../data/signals/ground_truth/ground_truth.npz")
+
+for method, color in methods.items():
+    # Load detected peaks of all samples
+    peaks_table = EventTable.load(f"../data/peaks/{method}_peaks.npz")
+
+    # Sum counts over all samples for every tolerance
+    tp = np.zeros(len(tols))
+    fp = np.zeros(len(tols))
+    fn = np.zeros(len(tols))
+    for name in samples:
+        peaks = peaks_table[name]
+        curve = metrics_curve(gt_table[name], None, peaks.t, peaks.amplitude, tols)
+        tp += curve["tp"]
+        fp += curve["fp"]
+        fn += curve["fn"]
+
+    # Plot pooled sensitivity and specificity
+    axes[0].plot(tols, tp / (tp + fn), color=color, label=method.capitalize())
+    axes[1].plot(
+        tols, tp / np.maximum(tp + fp, 1), color=color, label=method.capitalize()
+    )
+
+# Customize plots
+for ax, title in zip(axes, ["Sensitivity", "Specificity"]):
+    ax.set_title(f"{title} vs Tolerance")
+    ax.set_xlabel("Tolerance (s)")
+    ax.set_ylabel("Metric Value")
+    ax.set_xlim(tols.min(), tols.max())
+    ax.legend()
+
+# Adjust layout
+plt.tight_layout()
+
+# Save the plot as a PNG file
+output_path = "../images/tolerance_curve_plot.png"
+plt.savefig(output_path, dpi=300)
+
+# Display the plot
+plt.show()
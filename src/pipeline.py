@@ -0,0 +1,174 @@
+import os
+
+from analysis.metrics import metrics
+from analysis.metrics_table import MetricsTable
+from analysis.pyramid import write_pyramid
+from processing.ensemble import PEAK_POSITIONS, ensemble_method, method_peaks
+from processing.signal import Signal
+from storage.dataset import MatDataset
+from storage.events import EventTable
+from storage.signal_file import save_signal
+from storage.writer import AsyncWriter
+
+
+def run_pipeline(data_path, ref_path, out_root, params, fs, indices=None):
+    """
+    Run all methods on the samples of a MAT file and write their outputs.
+
+    Intermediate signals and pyramids go under out_root/signals, the peaks of
+    each method under out_root/peaks and the metrics table under
+    out_root/metrics.
+
+    Parameters:
+        data_path (str): MAT file with the signals and ground truth.
+        ref_path (str): MAT file with the reference peak.
+        out_root (str): Output root directory.
+        params (dict): Parameters of the "scipy", "hybrid", "custom" and
+            "consensus" methods.
+        fs (float): Sampling frequency (Hz).
+        indices (list or None): Zero-based sample indices to process, all
+            samples if None.
+
+    Returns:
+        list: Names of the processed samples.
+    """
+    from scipy.io import loadmat
+
+    # Open MAT file lazily, samples are read on demand while iterating
+    dataset = MatDataset(data_path, fs=fs, prefetch=2)
+
+    # Write outputs in background threads while the next sample is processed
+    writer = AsyncWriter(max_queue=32, workers=2)
+
+    # Leaving the block waits for pending writes, surfacing any write error,
+    # and releases the MAT file, also when a sample fails
+    with dataset, writer:
+        # Collect the metrics of all methods in a single table
+        metrics_table = MetricsTable()
+
+        # Load reference peak data
+        ref_peak = loadmat(ref_path)["xref"].flatten()
+
+        # Ground truth peaks of all samples, extracted once from the dense signals
+        gt_table = EventTable(fs, dataset.t0)
+
+        # Collect peaks of all samples for each method
+        peak_tables = {method: EventTable(fs, dataset.t0) for method in params}
+
+        # Ensure output directories exist
+        signals = f"{out_root}/signals"
+        os.makedirs(f"{signals}/raw/", exist_ok=True)
+        os.makedirs(f"{signals}/ground_truth/", exist_ok=True)
+        os.makedirs(f"{signals}/pyramids/raw/", exist_ok=True)
+        os.makedirs(f"{signals}/hybrid_method/filtered/", exist_ok=True)
+        os.makedirs(f"{signals}/hybrid_method/convolved/", exist_ok=True)
+        os.makedirs(f"{signals}/pyramids/hybrid_method/filtered/", exist_ok=True)
+        for stage in ["smoothed", "baseline", "filtered"]:
+            os.makedirs(f"{signals}/custom_method/{stage}", exist_ok=True)
+            os.makedirs(f"{signals}/pyramids/custom_method/{stage}", exist_ok=True)
+
+        # Load each signal once and run all methods on it
+        names = []
+        for name, sig in dataset.items(indices=indices):
+            names.append(name)
+
+            # Extract signals
+            raw = sig["raw"]
+
+            # Save samples only, the time axis goes into the file header
+            writer.submit(save_signal, f"{signals}/raw/{name}.txt", raw)
+
+            # Keep only the ground truth peaks
+            gt = sig["gt"].events()
+            gt_table.append(name, gt)
+
+            # Save plotting pyramid
+            writer.submit(
+                write_pyramid,
+                f"{signals}/pyramids/raw/{name}.npz",
+                raw.samples,
+                raw.t0,
+                raw.fs,
+            )
+
+            # Apply all methods and fuse their peaks
+            results = ensemble_method(
+                raw,
+                None,
+                gt,
+                ref_peak,
+                params["scipy"],
+                params["hybrid"],
+                params["custom"],
+                **params["consensus"],
+            )
+
+            # Save hybrid method intermediate results, at the reduced rate of the
+            # coarse-to-fine mode if enabled
+            filtered_sig, conv_sig = results["hybrid"][:2]
+            hybrid_fs = raw.fs / params["hybrid"].get("decim", 1)
+            writer.submit(
+                save_signal,
+                f"{signals}/hybrid_method/filtered/{name}.txt",
+                Signal(filtered_sig, hybrid_fs, raw.t0),
+            )
+            writer.savetxt(
+                f"{signals}/hybrid_method/convolved/{name}.txt",
+                conv_sig,
+                delimiter=",",
+                fmt="%.6f",
+            )
+            writer.submit(
+                write_pyramid,
+                f"{signals}/pyramids/hybrid_method/filtered/{name}.npz",
+                filtered_sig,
+                raw.t0,
+                hybrid_fs,
+            )
+
+            # Save custom method intermediate results and plotting pyramids
+            smoothed_sig, baseline_sig, filtered_sig = results["custom"][:3]
+            custom_fs = raw.fs / params["custom"].get("decim", 1)
+            for stage, stage_sig in [
+                ("smoothed", smoothed_sig),
+                ("baseline", baseline_sig),
+                ("filtered", filtered_sig),
+            ]:
+                writer.submit(
+                    save_signal,
+                    f"{signals}/custom_method/{stage}/{name}.txt",
+                    Signal(stage_sig, custom_fs, raw.t0),
+                )
+                writer.submit(
+                    write_pyramid,
+                    f"{signals}/pyramids/custom_method/{stage}/{name}.npz",
+                    stage_sig,
+                    raw.t0,
+                    custom_fs,
+                )
+
+            # Peak times and values of each method and the consensus
+            peaks = {m: method_peaks(m, results[m]) for m in PEAK_POSITIONS}
+            peaks["consensus"] = results["consensus"][:2]
+
+            # Store peak data and compute metrics on the stored events, so the
+            # metrics can be reproduced from the saved peaks
+            for method, (peak_t, peak_v) in peaks.items():
+                peak_tables[method].append_peaks(name, peak_t, peak_v)
+                events = peak_tables[method][name]
+                met = metrics(gt, None, events.t, events.amplitude, tol=0.5)
+                metrics_table.add(name, method, met, params[method])
+
+        # Save ground truth peaks of all samples in a single file
+        gt_table.save(f"{signals}/ground_truth/ground_truth.npz")
+
+        # Save the peaks of each method in a single file per method
+        os.makedirs(f"{out_root}/peaks/", exist_ok=True)
+        for method, table in peak_tables.items():
+            table.save(f"{out_root}/peaks/{method}_peaks.npz")
+
+        # Save the consolidated metrics table of all methods
+        os.makedirs(f"{out_root}/metrics/", exist_ok=True)
+        metrics_table.save(f"{out_root}/metrics/metrics.npz")
+
+    return names
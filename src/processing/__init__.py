@@ -0,0 +1,62 @@
+"""
+Peak detection methods and their building blocks.
+
+Importing the package is cheap: SciPy is imported inside the functions that
+need it, and the names below are resolved lazily, loading their submodule on
+first access. The detectors share their names with their submodules and are
+imported from them (from processing.custom_method import custom_method), so
+module imports such as import processing.custom_method keep working.
+"""
+
+import importlib
+
+# Public name -> submodule defining it
+_EXPORTS = {
+    "ensemble_method": "ensemble",
+    "consensus_peaks": "ensemble",
+    "scipy_batch": "batch",
+    "hybrid_batch": "batch",
+    "custom_batch": "batch",
+    "Signal": "signal",
+    "Events": "signal",
+    "TimeAxis": "signal",
+    "split_signal": "signal",
+    "estimate_baseline": "baseline",
+    "BASELINES": "baseline",
+    "peak_features": "features",
+    "PEAK_DTYPE": "features",
+    "PeakdetState": "streaming",
+    "HybridState": "streaming",
+}
+
+__all__ = [
+    "BASELINES",
+    "PEAK_DTYPE",
+    "Events",
+    "HybridState",
+    "PeakdetState",
+    "Signal",
+    "TimeAxis",
+    "consensus_peaks",
+    "custom_batch",
+    "ensemble_method",
+    "estimate_baseline",
+    "hybrid_batch",
+    "peak_features",
+    "scipy_batch",
+    "split_signal",
+]
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{_EXPORTS[name]}"), name)
+
+    # Cache the name so later lookups skip this hook
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
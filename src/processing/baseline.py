@@ -0,0 +1,257 @@
+from functools import lru_cache
+
+import numpy as np
+
+# Baseline methods selectable by name
+BASELINES = ("als", "arpls", "airpls", "morph", "percentile")
+
+
+@lru_cache(maxsize=8)
+def _second_diff_banded(n):
+    # D.T @ D for the second-order difference matrix D of size (n - 2, n), in
+    # the upper banded form of solveh_banded (second and first superdiagonals,
+    # then the main diagonal)
+    ab = np.zeros((3, n))
+    ab[0, 2:] = 1
+    ab[1, 1:] = -4
+    ab[1, [1, -1]] = -2
+    ab[2] = 6
+    ab[2, [0, -1]] = 1
+    ab[2, [1, -2]] = 5
+    ab.flags.writeable = False
+    return ab
+
+
+def whittaker_solve(sig, w, lam):
+    """
+    Solve the weighted, second-difference penalized smoothing system
+    (W + lam * D.T @ D) z = W sig shared by the least squares baselines.
+
+    The system is pentadiagonal and symmetric positive definite, so it is
+    solved with a banded Cholesky factorization in O(n).
+
+    Parameters:
+        sig (array): Input signal.
+        w (array): Weight of each sample.
+        lam (float): Smoothing parameter.
+
+    Returns:
+        array: The smoothed signal z.
+    """
+    from scipy.linalg import solveh_banded
+
+    ab = lam * _second_diff_banded(len(sig))
+    ab[2] += w
+    return solveh_banded(ab, w * sig, check_finite=False)
+
+
+# Define ALS baseline removal
+def als(sig, lam, pen, max_iter):
+    """
+    Remove the baseline from a signal using Asymmetric Least Squares (ALS).
+
+    Iterations stop early once the weights no longer change, since every
+    further iteration would return the same baseline, or when fewer than two
+    samples keep a non-zero weight, which would leave the system singular
+    (for example when the baseline fits a constant signal exactly).
+
+    Parameters:
+        sig (array): Input signal for baseline correction.
+        lam (float): Smoothing parameter for baseline estimation.
+        pen (float): Penalty parameter controlling baseline asymmetry.
+        max_iter (int): Maximum number of iterations for convergence.
+
+    Returns:
+        baseline (array): The computed baseline of the signal.
+
+    Reference:
+        Adapted version from
+        https://nirpyresearch.com/two-methods-baseline-correction-spectral-data/
+    """
+    # Initialize weights and baseline
+    w = np.ones(len(sig))
+    baseline = np.zeros(len(sig))
+
+    # Iteratively update weights and compute the baseline
+    for _ in range(max_iter):
+        # Solve the system to update the baseline
+        baseline = whittaker_solve(sig, w, lam)
+
+        # Update weights based on current baseline
+        new_w = pen * (sig > baseline) + (1 - pen) * (sig < baseline)
+        if np.array_equal(new_w, w) or np.count_nonzero(new_w) < 2:
+            break
+        w = new_w
+
+    return baseline
+
+
+def arpls(sig, lam, max_iter=50, ratio=1e-6):
+    """
+    Estimate the baseline with asymmetrically reweighted penalized least
+    squares (arPLS).
+
+    Weights follow a logistic function of the residual, scaled by the
+    statistics of the negative residuals, so samples are down-weighted
+    smoothly instead of with the hard rule of ALS.
+
+    Parameters:
+        sig (array): Input signal for baseline correction.
+        lam (float): Smoothing parameter for baseline estimation.
+        max_iter (int): Maximum number of iterations.
+        ratio (float): Stop when the relative change of the weights falls
+            below this value.
+
+    Returns:
+        baseline (array): The computed baseline of the signal.
+
+    Reference:
+        Baek et al., Baseline correction using asymmetrically reweighted
+        penalized least squares smoothing, Analyst, 2015.
+    """
+    w = np.ones(len(sig))
+    baseline = np.zeros(len(sig))
+
+    for _ in range(max_iter):
+        baseline = whittaker_solve(sig, w, lam)
+
+        # Logistic weights from the mean and spread of the negative residuals,
+        # each above 1/2, so at least two samples keep a non-zero weight
+        d = sig - baseline
+        neg = d[d < 0]
+        if len(neg) < 2:
+            break
+        m, s = np.mean(neg), np.std(neg)
+        new_w = 1 / (1 + np.exp(np.clip(2 * (d - (2 * s - m)) / s, -50, 50)))
+
+        # Stop when the weights settle
+        converged = np.linalg.norm(w - new_w) / np.linalg.norm(w) < ratio
+        w = new_w
+        if converged:
+            break
+
+    return baseline
+
+
+def airpls(sig, lam, max_iter=50, ratio=1e-3):
+    """
+    Estimate the baseline with adaptive iteratively reweighted penalized
+    least squares (airPLS).
+
+    Samples above the baseline get zero weight, and samples below it get a
+    weight growing exponentially with the iteration and the residual.
+
+    Parameters:
+        sig (array): Input signal for baseline correction.
+        lam (float): Smoothing parameter for baseline estimation.
+        max_iter (int): Maximum number of iterations.
+        ratio (float): Stop when the total negative residual falls below this
+            share of the total absolute signal.
+
+    Returns:
+        baseline (array): The computed baseline of the signal.
+
+    Reference:
+        Zhang et al., Baseline correction using adaptive iteratively
+        reweighted penalized least squares, Analyst, 2010.
+    """
+    w = np.ones(len(sig))
+    baseline = np.zeros(len(sig))
+    total = np.sum(np.abs(sig))
+
+    for i in range(1, max_iter + 1):
+        baseline = whittaker_solve(sig, w, lam)
+
+        # Stop when almost no sample lies below the baseline, and before the
+        # weights would leave fewer than two samples below it
+        d = sig - baseline
+        neg = d < 0
+        dssn = np.abs(np.sum(d[neg]))
+        if np.count_nonzero(neg) < 2 or dssn < ratio * total:
+            break
+
+        # Zero weight above the baseline, growing weight below it
+        w = np.zeros(len(sig))
+        w[neg] = np.exp(np.minimum(i * np.abs(d[neg]) / dssn, 50))
+        w[0] = w[-1] = np.exp(min(i * np.max(np.abs(d[neg])) / dssn, 50))
+
+    return baseline
+
+
+def morphological(sig, win_len):
+    """
+    Estimate the baseline with a grey opening smoothed by a moving average.
+
+    The opening (a running minimum followed by a running maximum) removes
+    every peak narrower than the window in O(n), whatever the window length,
+    which suits very long traces.
+
+    Parameters:
+        sig (array): Input signal for baseline correction.
+        win_len (int): Window length, longer than the widest peak.
+
+    Returns:
+        baseline (array): The computed baseline of the signal.
+    """
+    from scipy.ndimage import maximum_filter1d, minimum_filter1d, uniform_filter1d
+
+    opened = maximum_filter1d(minimum_filter1d(sig, win_len), win_len)
+    return uniform_filter1d(opened, win_len)
+
+
+def rolling_percentile(sig, win_len, q=10, hop=None):
+    """
+    Estimate the baseline as a low percentile of a sliding window.
+
+    The percentile is computed for windows every hop samples and linearly
+    interpolated in between, so the cost is independent of the signal detail.
+
+    Parameters:
+        sig (array): Input signal for baseline correction.
+        win_len (int): Window length, longer than the widest peak.
+        q (float): Percentile (0-100).
+        hop (int or None): Step between windows, win_len // 4 if None.
+
+    Returns:
+        baseline (array): The computed baseline of the signal.
+    """
+    n = len(sig)
+    win_len = min(win_len, n)
+    hop = hop or max(win_len // 4, 1)
+
+    # Percentile of each window, placed at the window center
+    starts = np.arange(0, n - win_len + 1, hop)
+    windows = np.lib.stride_tricks.sliding_window_view(sig, win_len)[starts]
+    values = np.percentile(windows, q, axis=1)
+    centers = starts + (win_len - 1) / 2
+
+    return np.interp(np.arange(n), centers, values)
+
+
+def estimate_baseline(sig, method="als", lam=1e8, pen=0.001, max_iter=50, **kwargs):
+    """
+    Estimate a baseline with any of the methods in BASELINES.
+
+    Parameters:
+        sig (array): Input signal for baseline correction.
+        method (str): Baseline method name.
+        lam (float): Smoothing parameter (least squares methods).
+        pen (float): Asymmetry parameter (ALS only).
+        max_iter (int): Maximum number of iterations (least squares methods).
+        **kwargs: Extra parameters of the method, such as ratio for arPLS and
+            airPLS, or win_len (required), q and hop for the window methods.
+
+    Returns:
+        baseline (array): The computed baseline of the signal.
+    """
+    if method == "als":
+        return als(sig, lam, pen, max_iter)
+    if method == "arpls":
+        return arpls(sig, lam, max_iter, **kwargs)
+    if method == "airpls":
+        return airpls(sig, lam, max_iter, **kwargs)
+    if method == "morph":
+        return morphological(sig, **kwargs)
+    if method == "percentile":
+        return rolling_percentile(sig, **kwargs)
+    raise ValueError(f"baseline must be one of {BASELINES}")
@@ -0,0 +1,152 @@
+import numpy as np
+
+from processing.baseline import estimate_baseline
+from processing.custom_method import _custom_coarse, _sgolay_coeff, _sgolay_pad, peakdet
+from processing.hybrid_method import _butter_band, hybrid_method
+from processing.scipy_method import scipy_method
+
+
+def sgolay_batch(sigs, win_len, poly_order):
+    """
+    Apply the Savitzky-Golay filter to stacked signals of equal length.
+
+    Parameters:
+        sigs (array): Signals, one per row.
+        win_len (int): Length of the sliding window (must be odd).
+        poly_order (int): Polynomial order for fitting within the window.
+
+    Returns:
+        array: Smoothed signals, row i equal to sgolay(sigs[i], ...).
+    """
+    from scipy.signal import fftconvolve
+
+    coeff = _sgolay_coeff(win_len, poly_order)
+    pad_start, pad_end = _sgolay_pad(sigs, (win_len - 1) // 2)
+    padded = np.concatenate((pad_start, sigs, pad_end), axis=-1)
+    return fftconvolve(padded, coeff[None, ::-1], mode="valid", axes=-1)
+
+
+def hybrid_batch(sigs, t, ref, fs, order, lc, hc, th, decim=1):
+    """
+    Hybrid method on stacked signals of equal length sharing a time axis.
+
+    Filtering and matched filtering run once on the whole stack, and only the
+    peak search runs per signal.
+
+    Parameters:
+        sigs (array): Signals, one per row.
+        t (array or TimeAxis): Time axis shared by all signals.
+        ref, fs, order, lc, hc, th, decim: As in hybrid_method.
+
+    Returns:
+        list: Peak times and peak amplitudes of each signal.
+    """
+    from scipy.signal import fftconvolve, filtfilt, find_peaks
+
+    sigs = np.atleast_2d(sigs)
+
+    # The coarse path refines peaks one signal at a time
+    if decim > 1:
+        return [
+            hybrid_method(sig, t, ref, fs, order, lc, hc, th, decim)[-2:]
+            for sig in sigs
+        ]
+
+    # Band-pass filter, rectify and match filter all signals at once
+    b, a = _butter_band(order, lc, hc, fs)
+    filtered = filtfilt(b, a, sigs, axis=-1)
+    filtered[filtered < 0] = 0
+    conv = fftconvolve(filtered, ref[None, :], mode="full", axes=-1)
+
+    # Detect peaks of each convolution signal
+    offset = int(np.ceil(len(ref) / 2))
+    results = []
+    for filtered_sig, conv_sig in zip(filtered, conv):
+        peaks_conv, _ = find_peaks(conv_sig, height=np.max(conv_sig) * th)
+        idx = peaks_conv - offset
+        results.append((t[idx], filtered_sig[idx]))
+
+    return results
+
+
+def custom_batch(
+    sigs,
+    t,
+    win_len,
+    poly_order,
+    lam,
+    pen,
+    max_iter,
+    th,
+    decim=1,
+    baseline="als",
+    baseline_params=None,
+):
+    """
+    Custom method on stacked signals of equal length sharing a time axis.
+
+    Smoothing runs once on the whole stack. Baseline removal and peak
+    detection run per signal, reusing the cached penalty of the length.
+
+    Parameters:
+        sigs (array): Signals, one per row.
+        t (array or TimeAxis): Time axis shared by all signals.
+        win_len, poly_order, lam, pen, max_iter, th, decim, baseline,
+            baseline_params: As in custom_method.
+
+    Returns:
+        list: Peak times and peak values of each signal.
+    """
+    sigs = np.atleast_2d(sigs)
+
+    # The coarse path refines peaks one signal at a time
+    if decim > 1:
+        return [
+            _custom_coarse(
+                sig,
+                t,
+                win_len,
+                poly_order,
+                lam,
+                pen,
+                max_iter,
+                th,
+                decim,
+                baseline,
+                baseline_params,
+            )[-2:]
+            for sig in sigs
+        ]
+
+    results = []
+    for smoothed_sig in sgolay_batch(sigs, win_len, poly_order):
+        baseline_sig = estimate_baseline(
+            smoothed_sig, baseline, lam, pen, max_iter, **(baseline_params or {})
+        )
+        filtered_sig = smoothed_sig - baseline_sig
+        max_peaks, _ = peakdet(t, filtered_sig, th)
+        results.append(([p[0] for p in max_peaks], [p[1] for p in max_peaks]))
+
+    return results
+
+
+def scipy_batch(sigs, t, gt_sigs, fs, win_dur, th1, th2):
+    """
+    SciPy method on stacked signals of equal length sharing a time axis.
+
+    The SciPy method adapts its windows to the ground truth of each signal, so
+    signals are processed one at a time.
+
+    Parameters:
+        sigs (array): Signals, one per row.
+        t (array or TimeAxis): Time axis shared by all signals.
+        gt_sigs (list): Ground truth of each signal.
+        fs, win_dur, th1, th2: As in scipy_method.
+
+    Returns:
+        list: Peak times and peak values of each signal.
+    """
+    return [
+        scipy_method(sig, t, gt_sig, fs, win_dur, th1, th2)
+        for sig, gt_sig in zip(np.atleast_2d(sigs), gt_sigs)
+    ]
@@ -0,0 +1,115 @@
+import numpy as np
+
+from processing.custom_method import custom_method
+from processing.hybrid_method import hybrid_method
+from processing.scipy_method import scipy_method
+
+# Position of the peak times in the output of each detector, followed by the
+# peak values, so the optional feature table appended last does not shift them
+PEAK_POSITIONS = {"scipy": 0, "hybrid": 2, "custom": 3}
+
+
+def method_peaks(method, result):
+    """
+    Peak times and values from the output of a detector.
+
+    Parameters:
+        method (str): Detector name ("scipy", "hybrid" or "custom").
+        result (tuple): Output of the detector, with or without features.
+
+    Returns:
+        tuple: Peak times and peak values.
+    """
+    pos = PEAK_POSITIONS[method]
+    return result[pos], result[pos + 1]
+
+
+def consensus_peaks(peak_sets, amp_sets, tol, min_votes=2):
+    """
+    Fuse the peaks of several detectors by voting within a time tolerance.
+
+    Peaks of all detectors are merged in time order and grouped greedily: a
+    group starts at the earliest unassigned peak and takes every later peak
+    within tol of it. Each detector votes at most once per group. A group is
+    placed at its member detection nearest to the median time, so consensus
+    peaks stay on the sample grid of the detectors.
+
+    Parameters:
+        peak_sets (list): Peak times of each detector.
+        amp_sets (list): Peak amplitudes of each detector.
+        tol (float): Grouping tolerance (s).
+        min_votes (int): Minimum number of detectors agreeing on a peak.
+
+    Returns:
+        tuple: Consensus peak times (of the member nearest the group median),
+        amplitudes (medians of the group) and number of votes.
+    """
+    # Merge peak times, remembering which detector found each one
+    times = np.concatenate([np.asarray(p, dtype=float) for p in peak_sets])
+    amps = np.concatenate([np.asarray(a, dtype=float) for a in amp_sets])
+    labels = np.concatenate(
+        [np.full(len(p), k, dtype=int) for k, p in enumerate(peak_sets)]
+    )
+    order = np.argsort(times, kind="stable")
+    times, amps, labels = times[order], amps[order], labels[order]
+
+    # Group peaks around the first peak of each group
+    peak_t, peak_v, votes = [], [], []
+    start = 0
+    while start < len(times):
+        stop = np.searchsorted(times, times[start] + tol, side="right")
+        n_votes = len(np.unique(labels[start:stop]))
+        if n_votes >= min_votes:
+            group_t = times[start:stop]
+            peak_t.append(group_t[np.argmin(np.abs(group_t - np.median(group_t)))])
+            peak_v.append(np.median(amps[start:stop]))
+            votes.append(n_votes)
+        start = stop
+
+    return np.array(peak_t), np.array(peak_v), np.array(votes, dtype=int)
+
+
+def ensemble_method(
+    sig, t, gt_sig, ref, scipy_params, hybrid_params, custom_params, tol, min_votes=2
+):
+    """
+    Run the SciPy, hybrid and custom methods on one signal and fuse their peaks.
+
+    The signal, its time axis and the ground truth are read once and shared
+    by all detectors, and filter designs, smoothing coefficients and baseline
+    penalties are cached across calls, so consecutive signals of a cohort reuse
+    them.
+
+    Parameters:
+        sig (array or Signal): Input signal.
+        t (array or None): Time vector, unused if sig is a Signal.
+        gt_sig (array, Signal or Events): Ground truth for the SciPy method.
+        ref (array): Reference peak window for the hybrid method.
+        scipy_params (dict): Keyword arguments of scipy_method.
+        hybrid_params (dict): Keyword arguments of hybrid_method.
+        custom_params (dict): Keyword arguments of custom_method.
+        tol (float): Voting tolerance for the consensus peaks (s).
+        min_votes (int): Minimum number of methods agreeing on a peak.
+
+    Returns:
+        dict: Outputs of each method under "scipy", "hybrid" and "custom", as
+        returned by the method, and under "consensus" the consensus peak times,
+        amplitudes and number of votes.
+    """
+    # Run each detector on the same signal
+    results = {
+        "scipy": scipy_method(sig, t, gt_sig, **scipy_params),
+        "hybrid": hybrid_method(sig, t, ref, **hybrid_params),
+        "custom": custom_method(sig, t, **custom_params),
+    }
+
+    # Fuse the peaks of all detectors
+    peaks = [method_peaks(name, results[name]) for name in PEAK_POSITIONS]
+    results["consensus"] = consensus_peaks(
+        [peak_t for peak_t, _ in peaks],
+        [peak_v for _, peak_v in peaks],
+        tol,
+        min_votes,
+    )
+
+    return results
@@ -0,0 +1,139 @@
+import warnings
+
+import numpy as np
+
+# Fields of the peak table returned by the detectors with features=True
+PEAK_DTYPE = np.dtype(
+    [
+        ("index", np.int64),
+        ("time", float),
+        ("height", float),
+        ("prominence", float),
+        ("width", float),
+        ("area", float),
+        ("snr", float),
+    ]
+)
+
+
+def noise_level(sig):
+    """
+    Robust noise standard deviation of a signal, from the median absolute
+    deviation of its first differences, so peaks and drift barely affect it.
+
+    Parameters:
+        sig (array): Signal values.
+
+    Returns:
+        float: Noise standard deviation.
+    """
+    diff = np.diff(sig)
+    return 1.4826 * np.median(np.abs(diff - np.median(diff))) / np.sqrt(2)
+
+
+def _climb(sig, idx):
+    # Move every index uphill, all at once, until it sits on a local maximum
+    last = len(sig) - 1
+    while True:
+        left = sig[np.maximum(idx - 1, 0)]
+        right = sig[np.minimum(idx + 1, last)]
+        here = sig[idx]
+        step = np.where(
+            (right > here) & (right >= left), 1, np.where(left > here, -1, 0)
+        )
+        if not step.any():
+            return idx
+        idx = idx + step
+
+
+def peak_features(
+    sig, idx, times, dt, prominence_data=None, rel_height=0.5, noise=None
+):
+    """
+    Compute the features of all peaks of a signal in one vectorized pass.
+
+    Prominence, width and area are measured at the local maximum of sig each
+    peak lies on, so peaks located through another signal (such as the
+    matched filter output of the hybrid method) are measured on their hill.
+
+    Parameters:
+        sig (array): Signal the peaks were detected on.
+        idx (array): Peak indices into sig.
+        times (array): Peak times.
+        dt (float): Sampling interval of sig (s).
+        prominence_data (tuple or None): Prominences, left bases and right
+            bases already computed by find_peaks for idx, recomputed if None.
+        rel_height (float): Relative height of the width measurement, 0.5
+            for the full width at half prominence.
+        noise (float or None): Noise standard deviation for the SNR,
+            estimated from sig with noise_level if None.
+
+    Returns:
+        array: Structured peak table with PEAK_DTYPE fields. Width is in
+        seconds, area is the integral of the peak above the width line, and
+        snr is the prominence over the noise level.
+    """
+    from scipy.signal import peak_prominences, peak_widths
+
+    sig = np.asarray(sig, dtype=float)
+    idx = np.asarray(idx, dtype=np.int64)
+    table = np.zeros(len(idx), dtype=PEAK_DTYPE)
+    table["index"] = idx
+    table["time"] = times
+    if len(idx) == 0:
+        return table
+
+    # Local maxima to measure, the peaks themselves when find_peaks found them
+    top = idx if prominence_data is not None else _climb(sig, idx)
+
+    # Flat tops at the signal edges have no prominence, silence the property
+    # warnings SciPy raises for them
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        if prominence_data is None:
+            prominence_data = peak_prominences(sig, top)
+        widths, width_heights, left_ips, right_ips = peak_widths(
+            sig, top, rel_height, prominence_data=prominence_data
+        )
+
+    # Area above the width line from a cumulative sum, no loop over peaks
+    cumsum = np.concatenate(([0.0], np.cumsum(sig)))
+    left = np.ceil(left_ips).astype(np.int64)
+    right = np.floor(right_ips).astype(np.int64)
+    count = np.maximum(right - left + 1, 0)
+    area = cumsum[np.maximum(right + 1, left)] - cumsum[left] - width_heights * count
+
+    table["height"] = sig[idx]
+    table["prominence"] = prominence_data[0]
+    table["width"] = widths * dt
+    table["area"] = np.maximum(area, 0) * dt
+    if noise is None:
+        noise = noise_level(sig)
+    table["snr"] = prominence_data[0] / noise if noise > 0 else np.inf
+    return table
+
+
+def coarse_peak_features(coarse_sig, idx, times, heights, dt, decim, noise=None):
+    """
+    Peak features for the coarse-to-fine detectors, measured on the decimated
+    signal at the coarse sample nearest to each full resolution peak.
+
+    Parameters:
+        coarse_sig (array): Decimated signal the peaks were detected on.
+        idx (array): Full resolution peak indices.
+        times (array): Peak times.
+        heights (array): Refined full resolution peak values.
+        dt (float): Full resolution sampling interval (s).
+        decim (int): Decimation factor.
+        noise (float or None): Noise standard deviation for the SNR.
+
+    Returns:
+        array: Structured peak table, see peak_features, with full resolution
+        indices and heights.
+    """
+    idx = np.asarray(idx, dtype=np.int64)
+    coarse_idx = np.clip(np.rint(idx / decim).astype(np.int64), 0, len(coarse_sig) - 1)
+    table = peak_features(coarse_sig, coarse_idx, times, dt * decim, noise=noise)
+    table["index"] = idx
+    table["height"] = heights
+    return table
@@ -0,0 +1,72 @@
+import numpy as np
+
+
+def downsample(sig, q):
+    """
+    Anti-aliased decimation by an integer factor.
+
+    Sample k of the output lies at sample k * q of the input.
+
+    Parameters:
+        sig (array): Input signal.
+        q (int): Decimation factor.
+
+    Returns:
+        array: Decimated signal.
+    """
+    from scipy.signal import decimate
+
+    return decimate(sig, q, ftype="fir", zero_phase=True)
+
+
+def parabolic_peak(y, idx):
+    """
+    Refine peak positions and heights with a parabola through each peak sample
+    and its two neighbours.
+
+    Parameters:
+        y (array): Signal values.
+        idx (array): Indices of local maxima of y.
+
+    Returns:
+        tuple: Fractional peak positions and interpolated peak heights.
+    """
+    idx = np.asarray(idx, dtype=int)
+    y0 = y[idx]
+    ym = y[np.maximum(idx - 1, 0)]
+    yp = y[np.minimum(idx + 1, len(y) - 1)]
+
+    # Vertex offset of the parabola, kept within half a sample
+    curv = ym - 2 * y0 + yp
+    with np.errstate(invalid="ignore", divide="ignore"):
+        delta = np.where(curv < 0, 0.5 * (ym - yp) / curv, 0.0)
+    delta = np.clip(delta, -0.5, 0.5)
+
+    return idx + delta, y0 - 0.25 * (ym - yp) * delta
+
+
+def interp_cubic(y, x):
+    """
+    Evaluate a signal at fractional sample positions with 4-point cubic
+    (Catmull-Rom) interpolation.
+
+    Parameters:
+        y (array): Signal values.
+        x (array): Fractional sample positions.
+
+    Returns:
+        array: Interpolated values.
+    """
+    x = np.clip(np.asarray(x, dtype=float), 0, len(y) - 1)
+    i = np.floor(x).astype(int)
+    u = x - i
+
+    # Four neighbouring samples, repeating the edge values
+    p0 = y[np.clip(i - 1, 0, len(y) - 1)]
+    p1 = y[i]
+    p2 = y[np.minimum(i + 1, len(y) - 1)]
+    p3 = y[np.minimum(i + 2, len(y) - 1)]
+
+    return p1 + 0.5 * u * (
+        p2 - p0 + u * (2 * p0 - 5 * p1 + 4 * p2 - p3 + u * (3 * (p1 - p2) + p3 - p0))
+    )
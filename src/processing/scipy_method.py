@@ -1,32 +1,51 @@
 import numpy as np
-from scipy.signal import find_peaks
 
+from processing.features import peak_features
+from processing.signal import Events, split_signal
 
-def scipy_method(sig, t, gt_sig, fs, win_dur, th1, th2):
+
+def scipy_method(sig, t, gt_sig, fs, win_dur, th1, th2, features=False):
     """
     Detect peaks in a signal using sliding windows.
 
     Parameters:
-        sig (array): Input signal.
-        t (array): Time vector for the signal.
-        gt_sig (array): Ground truth signal for peak detection.
+        sig (array or Signal): Input signal.
+        t (array or None): Time vector for the signal, unused if sig is a
+            Signal.
+        gt_sig (array, Signal or Events): Ground truth signal, or ground truth
+            events, for peak detection.
         fs (float): Sampling frequency (Hz).
         win_dur (int): Window size in seconds.
         th1 (float): Threshold factor for peak height.
         th2 (float): Threshold factor for peak prominence.
+        features (bool): Also return a peak table with the features of each
+            peak (see processing.features), reusing the prominences computed
+            by find_peaks in each window.
 
     Returns:
-        tuple: Lists of detected peak times and peak values.
+        tuple: Lists of detected peak times and peak values, and the peak
+        table if features is set.
     """
+    from scipy.signal import find_peaks
+
+    # Separate samples from the time axis
+    sig, t = split_signal(sig, t)
+
     # Initialize lists for detected peaks
     peak_t = []
     peak_v = []
 
+    # Peak indices and find_peaks prominence data, kept for the features
+    peak_idx, prominences, left_bases, right_bases = [], [], [], []
+
     # Calculate window duration in samples
     win_size = fs * win_dur
 
-    # Extract ground truth times
-    gt_t = t[np.where(gt_sig > 0)]
+    # Extract ground truth times, scanning the dense signal only if needed
+    if isinstance(gt_sig, Events):
+        gt_t = t[gt_sig.index]
+    else:
+        gt_t = t[np.flatnonzero(np.asarray(gt_sig) > 0)]
 
     # Calculate the number of windows
     num_windows = (len(t) + win_size - 1) // win_size
@@ -49,14 +68,14 @@ def scipy_method(sig, t, gt_sig, fs, win_dur, th1, th2):
             # One ground truth peak: use half max_v as height and ignore distance
             max_v = np.max(win_sig)
             min_h = th1 * max_v
-            peaks, _ = find_peaks(win_sig, height=min_h, prominence=th2 * max_v)
+            peaks, props = find_peaks(win_sig, height=min_h, prominence=th2 * max_v)
         else:
             # Two or more ground truth peaks: use height, distance, and prominence
             max_v = np.max(win_sig)
             min_h = th1 * max_v
             mean_diff = np.mean(np.diff(gt_t[gt_idx_window]))
             min_d = max(int(mean_diff * fs), 1)
-            peaks, _ = find_peaks(
+            peaks, props = find_peaks(
                 win_sig, height=min_h, distance=min_d, prominence=th2 * max_v
             )
 
@@ -64,4 +83,24 @@ def scipy_method(sig, t, gt_sig, fs, win_dur, th1, th2):
         peak_t.extend(win_t[peaks])
         peak_v.extend(win_sig[peaks])
 
-    return peak_t, peak_v
+        if features:
+            peak_idx.append(peaks + start_idx)
+            prominences.append(props["prominences"])
+            left_bases.append(props["left_bases"] + start_idx)
+            right_bases.append(props["right_bases"] + start_idx)
+
+    if not features:
+        return peak_t, peak_v
+
+    # Features of all peaks in one pass, with the window prominences
+    if peak_idx:
+        prominence_data = tuple(
+            np.concatenate(x) for x in (prominences, left_bases, right_bases)
+        )
+        table = peak_features(
+            sig, np.concatenate(peak_idx), peak_t, 1 / fs, prominence_data
+        )
+    else:
+        table = peak_features(sig, [], [], 1 / fs)
+
+    return peak_t, peak_v, table
@@ -0,0 +1,192 @@
+import numpy as np
+
+
+class TimeAxis:
+    """
+    Uniform time axis computed on access instead of being stored.
+
+    Indexing behaves like indexing the full time vector: integers give a float,
+    slices and index arrays give an array, and negative indices wrap around.
+
+    Parameters:
+        t0 (float): Time of the first sample.
+        fs (float): Sampling frequency (Hz).
+        n (int): Number of samples.
+    """
+
+    def __init__(self, t0, fs, n):
+        self.t0 = t0
+        self.fs = fs
+        self.n = n
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            idx = np.arange(*idx.indices(self.n))
+        elif np.isscalar(idx):
+            if not -self.n <= idx < self.n:
+                raise IndexError(f"index {idx} out of range")
+            return self.t0 + (idx % self.n) / self.fs
+        else:
+            idx = np.asarray(idx)
+            if idx.dtype == bool:
+                idx = np.flatnonzero(idx)
+            if np.any((idx < -self.n) | (idx >= self.n)):
+                raise IndexError("index out of range")
+            idx = np.where(idx < 0, idx + self.n, idx)
+        return self.t0 + idx / self.fs
+
+    def __array__(self, dtype=None, copy=None):
+        return self[:].astype(dtype) if dtype is not None else self[:]
+
+
+class Signal:
+    """
+    Uniformly sampled signal stored as (t0, fs, samples).
+
+    The time vector is only materialized when the t attribute is read.
+    Signals built with from_time keep the given time vector instead, so times
+    match the original data exactly.
+
+    Parameters:
+        samples (array): Signal values.
+        fs (float): Sampling frequency (Hz).
+        t0 (float): Time of the first sample.
+    """
+
+    def __init__(self, samples, fs, t0=0.0):
+        self.samples = np.asarray(samples)
+        self.fs = fs
+        self.t0 = t0
+        self._t = None
+
+    @classmethod
+    def from_time(cls, t, samples):
+        """
+        Build a signal from an explicit, uniformly spaced time vector.
+
+        Parameters:
+            t (array): Time vector.
+            samples (array): Signal values.
+
+        Returns:
+            Signal: Signal keeping t as its time vector.
+        """
+        t = np.asarray(t, dtype=float)
+        fs = (len(t) - 1) / (t[-1] - t[0]) if len(t) > 1 else 1.0
+        signal = cls(samples, fs, t[0] if len(t) else 0.0)
+        signal._t = t
+        return signal
+
+    def __len__(self):
+        return len(self.samples)
+
+    def __array__(self, dtype=None, copy=None):
+        return self.samples if dtype is None else self.samples.astype(dtype)
+
+    @property
+    def axis(self):
+        """Time axis, the stored vector if there is one or a TimeAxis."""
+        if self._t is not None:
+            return self._t
+        return TimeAxis(self.t0, self.fs, len(self.samples))
+
+    @property
+    def t(self):
+        """Time vector, computed on first access."""
+        if self._t is None:
+            self._t = self.axis[:]
+        return self._t
+
+    def time_at(self, idx):
+        """
+        Time of the given sample indices.
+
+        Parameters:
+            idx (int or array): Sample indices.
+
+        Returns:
+            float or array: Times in seconds.
+        """
+        return self.axis[idx]
+
+    def events(self):
+        """
+        Non-zero samples of a sparse signal, such as a dense ground truth.
+
+        Returns:
+            Events: Indices and amplitudes of the positive samples.
+        """
+        idx = np.flatnonzero(self.samples > 0)
+        return Events(idx, self.samples[idx], self.fs, self.t0)
+
+    def with_samples(self, samples):
+        """Signal with the same time axis and new sample values."""
+        signal = Signal(samples, self.fs, self.t0)
+        signal._t = self._t
+        return signal
+
+
+class Events:
+    """
+    Peak events of one signal, as sample indices and amplitudes on a uniform
+    time axis.
+
+    Parameters:
+        index (array): Sample indices of the peaks.
+        amplitude (array): Peak amplitudes.
+        fs (float): Sampling frequency (Hz).
+        t0 (float): Time of the first sample.
+    """
+
+    def __init__(self, index, amplitude, fs, t0=0.0):
+        self.index = np.asarray(index, dtype=np.int64)
+        self.amplitude = np.asarray(amplitude, dtype=float)
+        self.fs = fs
+        self.t0 = t0
+
+    @classmethod
+    def from_times(cls, times, amplitude, fs, t0=0.0):
+        """
+        Build events from peak times lying on the sample grid.
+
+        Parameters:
+            times (array): Peak times.
+            amplitude (array): Peak amplitudes.
+            fs (float): Sampling frequency (Hz).
+            t0 (float): Time of the first sample.
+
+        Returns:
+            Events: Events with times rounded to the nearest sample.
+        """
+        times = np.asarray(times, dtype=float)
+        index = np.rint((times - t0) * fs).astype(np.int64)
+        return cls(index, amplitude, fs, t0)
+
+    def __len__(self):
+        return len(self.index)
+
+    @property
+    def t(self):
+        """Peak times in seconds."""
+        return self.t0 + self.index / self.fs
+
+
+def split_signal(sig, t=None):
+    """
+    Separate sample values and time axis of a signal argument.
+
+    Parameters:
+        sig (Signal or array): Signal container or sample values.
+        t (array or None): Time vector, used when sig is a plain array.
+
+    Returns:
+        tuple: Sample values and a time axis indexable like the time vector.
+    """
+    if isinstance(sig, Signal):
+        return sig.samples, sig.axis
+    if t is None:
+        raise ValueError("t is required when sig is not a Signal")
+    return np.asarray(sig), np.asarray(t)
@@ -0,0 +1,190 @@
+from functools import lru_cache
+
+import numpy as np
+
+
+class PeakdetState:
+    """
+    Hysteresis peak detection of peakdet, advanced over many channels at once.
+
+    The state of every channel (current minimum and maximum, their sample
+    indices and whether a maximum is being searched) is held in arrays, so one
+    update call processes a chunk of all channels with a loop over the chunk
+    samples only. Feeding a signal in chunks of any size finds the same
+    maxima as peakdet on the whole signal.
+
+    Parameters:
+        n_channels (int): Number of channels.
+        th (float or array): Detection threshold, shared or one per channel.
+    """
+
+    def __init__(self, n_channels, th):
+        self.n_channels = n_channels
+        self.th = np.broadcast_to(np.asarray(th, dtype=float), (n_channels,))
+        self.min_val = np.full(n_channels, np.inf)
+        self.max_val = np.full(n_channels, -np.inf)
+        self.min_i = np.zeros(n_channels, dtype=np.int64)
+        self.max_i = np.zeros(n_channels, dtype=np.int64)
+        self.finding_max = np.ones(n_channels, dtype=bool)
+        self.n = 0
+
+    def update(self, chunk):
+        """
+        Advance all channels by a chunk of samples.
+
+        Parameters:
+            chunk (array): New samples, shape (n_channels, n_samples).
+
+        Returns:
+            tuple: Channel, sample index (counted from the stream start) and
+            value of the maxima confirmed in this chunk, ordered by index.
+        """
+        chunk = np.asarray(chunk, dtype=float)
+        if chunk.shape[0] != self.n_channels:
+            raise ValueError(f"expected {self.n_channels} channels")
+
+        channels, indices, values = [], [], []
+        for j in range(chunk.shape[1]):
+            val = chunk[:, j]
+            i = self.n + j
+
+            # Track the running maximum and minimum
+            up = val > self.max_val
+            self.max_val[up] = val[up]
+            self.max_i[up] = i
+            down = val < self.min_val
+            self.min_val[down] = val[down]
+            self.min_i[down] = i
+
+            # Maxima confirmed by a drop of th, switch to finding a minimum
+            found_max = self.finding_max & (val < self.max_val - self.th)
+            # Minima confirmed by a rise of th, switch to finding a maximum
+            found_min = ~self.finding_max & (val > self.min_val + self.th)
+
+            if found_max.any():
+                ch = np.flatnonzero(found_max)
+                channels.append(ch)
+                indices.append(self.max_i[ch])
+                values.append(self.max_val[ch])
+                self.min_val[ch] = val[ch]
+                self.min_i[ch] = i
+            if found_min.any():
+                self.max_val[found_min] = val[found_min]
+                self.max_i[found_min] = i
+            self.finding_max ^= found_max | found_min
+
+        self.n += chunk.shape[1]
+        return _concat(channels, indices, values)
+
+
+@lru_cache(maxsize=16)
+def _butter_band_sos(order, lc, hc, fs):
+    # Band-pass second-order sections, cached for reuse across streams
+    from scipy.signal import butter
+
+    return butter(order, [lc / (fs / 2), hc / (fs / 2)], btype="band", output="sos")
+
+
+class HybridState:
+    """
+    Threshold detection of hybrid_method, advanced over many channels at once.
+
+    Each chunk is band-pass filtered with per-channel filter states, rectified
+    and matched filtered with the tail of the previous chunk, and local maxima
+    of the convolution above th times its running maximum are reported. This
+    is the causal counterpart of hybrid_method: the filter runs forward only
+    and the threshold uses the maximum seen so far instead of the maximum of
+    the whole signal.
+
+    Parameters:
+        n_channels (int): Number of channels.
+        ref (array): Reference peak window for matched filtering.
+        fs (float): Sampling frequency.
+        order (int): Order of the Butterworth filter.
+        lc (float): Low cutoff frequency for the band-pass filter (Hz).
+        hc (float): High cutoff frequency for the band-pass filter (Hz).
+        th (float or array): Threshold factor, shared or one per channel.
+    """
+
+    def __init__(self, n_channels, ref, fs, order, lc, hc, th):
+        self.n_channels = n_channels
+        self.ref = np.asarray(ref, dtype=float)
+        self.th = np.broadcast_to(np.asarray(th, dtype=float), (n_channels,))
+        self.sos = _butter_band_sos(order, lc, hc, fs)
+        self.offset = int(np.ceil(len(self.ref) / 2))
+
+        # Filter states, filtered tail for the convolution, last two
+        # convolution values and running maximum of each channel
+        self.zi = np.zeros((self.sos.shape[0], n_channels, 2))
+        self.tail = np.zeros((n_channels, max(len(self.ref) - 1, self.offset + 1)))
+        self.last = np.full((n_channels, 2), -np.inf)
+        self.run_max = np.full(n_channels, -np.inf)
+        self.n = 0
+
+    def update(self, chunk):
+        """
+        Advance all channels by a chunk of samples.
+
+        Parameters:
+            chunk (array): New samples, shape (n_channels, n_samples).
+
+        Returns:
+            tuple: Channel, sample index (counted from the stream start) and
+            filtered value of the peaks confirmed in this chunk, ordered by
+            channel. A peak is confirmed one sample after its convolution
+            maximum.
+        """
+        chunk = np.asarray(chunk, dtype=float)
+        if chunk.shape[0] != self.n_channels:
+            raise ValueError(f"expected {self.n_channels} channels")
+        m = chunk.shape[1]
+        if m == 0:
+            return _concat([], [], [])
+        from scipy.signal import fftconvolve, sosfilt
+
+        # Band-pass filter from the previous filter state and rectify
+        filtered, self.zi = sosfilt(self.sos, chunk, axis=-1, zi=self.zi)
+        filtered[filtered < 0] = 0
+
+        # Matched filter over the previous tail and the new samples, giving the
+        # convolution at the new sample positions
+        ext = np.concatenate((self.tail, filtered), axis=1)
+        conv = fftconvolve(ext, self.ref[None, :], mode="valid", axes=-1)[:, -m:]
+
+        # Local maxima at the previous sample and all but the last new sample
+        seq = np.concatenate((self.last, conv), axis=1)
+        mid = seq[:, 1:-1]
+        is_peak = (mid > seq[:, :-2]) & (mid >= seq[:, 2:])
+
+        # Height above th times the running maximum up to the candidate
+        run_max = np.maximum.accumulate(
+            np.concatenate((self.run_max[:, None], conv), axis=1), axis=1
+        )
+        is_peak &= mid >= self.th[:, None] * run_max[:, :-1]
+
+        # Map convolution peaks to signal indices with the matched filter offset
+        ch, pos = np.nonzero(is_peak)
+        conv_idx = self.n - 1 + pos
+        idx = conv_idx - self.offset
+        keep = idx >= 0
+        ch, idx = ch[keep], idx[keep]
+        values = ext[ch, idx - self.n + self.tail.shape[1]]
+
+        # Keep the state needed by the next chunk
+        self.tail = ext[:, ext.shape[1] - self.tail.shape[1] :]
+        self.last = seq[:, -2:]
+        self.run_max = run_max[:, -1]
+        self.n += m
+
+        return ch, idx, values
+
+
+def _concat(channels, indices, values):
+    # Concatenate per-step detections into flat arrays
+    if not channels:
+        return (
+            np.zeros(0, dtype=np.int64),
+            np.zeros(0, dtype=np.int64),
+            np.zeros(0),
+        )
+    return np.concatenate(channels), np.concatenate(indices), np.concatenate(values)
@@ -0,0 +1,283 @@
+import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlparse
+
+import numpy as np
+from scipy.io import loadmat
+
+from processing.batch import custom_batch, hybrid_batch, scipy_batch
+from processing.signal import TimeAxis
+
+# Address of the local service
+host, port = "127.0.0.1", 8765
+
+# Longest time a request waits for others to join its batch (s)
+max_delay = 0.005
+
+# Largest number of signals processed in one batch
+max_batch = 32
+
+
+def _number(text):
+    # Integers stay integers, as window lengths and orders require, and
+    # non-numeric values such as the baseline method stay strings
+    for cast in (int, float):
+        try:
+            return cast(text)
+        except ValueError:
+            pass
+    return text
+
+
+class MicroBatcher:
+    """
+    Group concurrent detection requests into batched calls.
+
+    Requests with the same method, parameters, length and time axis are queued
+    together and processed as one stack once max_batch requests are waiting or
+    the oldest one has waited max_delay. Detection runs in a single background
+    thread, so the filter, smoothing and baseline caches stay warm between
+    batches.
+
+    Parameters:
+        ref (array): Reference peak window for the hybrid method.
+        max_delay (float): Longest batching delay (s).
+        max_batch (int): Largest batch size.
+        window (int): Number of recent requests kept for latency percentiles.
+    """
+
+    def __init__(self, ref, max_delay=0.005, max_batch=32, window=10000):
+        self.ref = ref
+        self.max_delay = max_delay
+        self.max_batch = max_batch
+        self._queues = {}
+        self._cond = threading.Condition()
+        self._latencies = deque(maxlen=window)
+        self._batch_sizes = deque(maxlen=window)
+        self._requests = 0
+        self._start = time.perf_counter()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, method, params, sig, gt_sig=None):
+        """
+        Queue one signal for detection.
+
+        Parameters:
+            method (str): Method name ("scipy", "hybrid" or "custom").
+            params (dict): Method parameters, including the sampling frequency
+                fs (also for the custom method) and optionally the start time
+                t0.
+            sig (array): Signal samples.
+            gt_sig (array or None): Dense ground truth (SciPy method only).
+
+        Returns:
+            Future: Resolves to the peak times and peak values.
+        """
+        if method not in ("scipy", "hybrid", "custom"):
+            raise ValueError(f"unknown method {method!r}")
+        if "fs" not in params:
+            raise ValueError("the sampling frequency fs is required")
+        if method == "scipy" and gt_sig is None:
+            raise ValueError("the scipy method needs a ground truth signal")
+
+        future = Future()
+        key = (method, tuple(sorted(params.items())), len(sig))
+        with self._cond:
+            queue = self._queues.setdefault(key, [])
+            queue.append((sig, gt_sig, future, time.perf_counter()))
+            self._cond.notify()
+        return future
+
+    def _run(self):
+        # Dispatch loop: wait for a full or expired queue and process it
+        while True:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        return
+                    now = time.perf_counter()
+                    ready = [
+                        key
+                        for key, queue in self._queues.items()
+                        if len(queue) >= self.max_batch
+                        or now - queue[0][3] >= self.max_delay
+                    ]
+                    if ready:
+                        break
+                    deadlines = [
+                        q[0][3] + self.max_delay for q in self._queues.values()
+                    ]
+                    self._cond.wait(min(deadlines) - now if deadlines else None)
+                batches = []
+                for key in ready:
+                    queue = self._queues.pop(key)
+                    batches.append((key, queue[: self.max_batch]))
+                    if len(queue) > self.max_batch:
+                        self._queues[key] = queue[self.max_batch :]
+
+            for key, batch in batches:
+                self._process(key, batch)
+
+    def _detect(self, method, params, t, batch):
+        # Run the batch function of a method on the requests of a batch
+        sigs = np.stack([item[0] for item in batch])
+        if method == "hybrid":
+            return hybrid_batch(sigs, t, self.ref, **params)
+        if method == "custom":
+            return custom_batch(sigs, t, **params)
+        return scipy_batch(sigs, t, [item[1] for item in batch], **params)
+
+    def _process(self, key, batch):
+        # Run one batch and resolve the futures of its requests
+        method, params, n = key
+        params = dict(params)
+        t = TimeAxis(params.pop("t0", 0.0), params["fs"], n)
+        if method == "custom":
+            params.pop("fs")
+
+        # A failing batch is rerun one request at a time, so a bad signal only
+        # fails its own request
+        try:
+            outcomes = [(r, None) for r in self._detect(method, params, t, batch)]
+        except Exception:  # noqa: BLE001
+            outcomes = []
+            for item in batch:
+                try:
+                    outcomes.append((self._detect(method, params, t, [item])[0], None))
+                except Exception as exc:  # noqa: BLE001
+                    # Any error of a detector belongs to its caller's future
+                    outcomes.append((None, exc))
+
+        done = time.perf_counter()
+        with self._cond:
+            self._requests += len(batch)
+            self._batch_sizes.append(len(batch))
+            self._latencies.extend(done - item[3] for item in batch)
+        for item, (result, exc) in zip(batch, outcomes):
+            if exc is None:
+                item[2].set_result(result)
+            else:
+                item[2].set_exception(exc)
+
+    def stats(self):
+        """
+        Throughput and latency of the service.
+
+        Returns:
+            dict: Request count, requests per second since start, mean batch
+            size and p50/p95/p99 latencies (ms) of the recent requests.
+        """
+        with self._cond:
+            latencies = np.array(self._latencies) * 1000
+            sizes = list(self._batch_sizes)
+            requests = self._requests
+        elapsed = time.perf_counter() - self._start
+        stats = {
+            "requests": requests,
+            "throughput": requests / elapsed if elapsed > 0 else 0.0,
+            "mean_batch_size": float(np.mean(sizes)) if sizes else 0.0,
+        }
+        for q in (50, 95, 99):
+            stats[f"p{q}_ms"] = (
+                float(np.percentile(latencies, q)) if len(latencies) else None
+            )
+        return stats
+
+    def close(self):
+        """Stop the dispatch thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+
+
+class DetectionHandler(BaseHTTPRequestHandler):
+    """
+    HTTP interface of the service.
+
+    POST /detect/<method>?fs=...&<param>=... with the signal as raw
+    little-endian float64 samples in the body returns the detected peaks as
+    JSON. For the SciPy method the body holds the signal followed by its dense
+    ground truth, both of the same length. GET /stats returns the service
+    statistics.
+    """
+
+    batcher = None
+
+    def do_GET(self):
+        if urlparse(self.path).path != "/stats":
+            self._reply(404, {"error": "not found"})
+            return
+        self._reply(200, self.batcher.stats())
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        parts = url.path.strip("/").split("/")
+        if len(parts) != 2 or parts[0] != "detect":
+            self._reply(404, {"error": "not found"})
+            return
+        method = parts[1]
+
+        try:
+            # Parameters from the query string
+            params = {k: _number(v) for k, v in parse_qsl(url.query)}
+
+            # Signal (and ground truth) from the body
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            data = np.frombuffer(body, dtype="<f8")
+            gt_sig = None
+            if method == "scipy":
+                data, gt_sig = np.split(data, 2)
+
+            peak_t, peak_v = self.batcher.submit(method, params, data, gt_sig).result()
+        except (ValueError, TypeError) as exc:
+            self._reply(400, {"error": str(exc)})
+            return
+        except Exception as exc:  # noqa: BLE001
+            # Report any detector failure to the client instead of dropping
+            # the connection
+            self._reply(500, {"error": str(exc)})
+            return
+
+        self._reply(
+            200,
+            {
+                "peak_t": np.asarray(peak_t, dtype=float).tolist(),
+                "peak_v": np.asarray(peak_v, dtype=float).tolist(),
+            },
+        )
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Keep request logging out of the latency path
+        pass
+
+
+if __name__ == "__main__":
+    # Load reference peak data for the hybrid method
+    ref_peak = loadmat("../data/signals/ref_peak.mat")["xref"].flatten()
+
+    # Start the batcher and serve until interrupted
+    DetectionHandler.batcher = MicroBatcher(ref_peak, max_delay, max_batch)
+    server = ThreadingHTTPServer((host, port), DetectionHandler)
+    print(f"Serving peak detection on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        DetectionHandler.batcher.close()
@@ -0,0 +1,52 @@
+import argparse
+import os
+
+from main import fs, params
+from pipeline import run_pipeline
+from storage.dataset import MatDataset
+from storage.shards import merge_shards, shard_indices, write_manifest
+
+# Cohort and reference peak on the shared filesystem
+data_path = "../data/signals/raw/data.mat"
+ref_path = "../data/signals/ref_peak.mat"
+
+
+def run(shard, n_shards, out_dir):
+    # Samples of this shard, from a hash of their names
+    with MatDataset(data_path, fs=fs) as dataset:
+        names = [dataset.name(i) for i in range(len(dataset))]
+    indices = shard_indices(names, shard, n_shards)
+
+    # Process the shard into its own directory and record its checksums
+    shard_dir = os.path.join(out_dir, f"shard_{shard:03d}")
+    samples = run_pipeline(data_path, ref_path, shard_dir, params, fs, indices)
+    write_manifest(
+        shard_dir, shard=shard, n_shards=n_shards, samples=samples, indices=indices
+    )
+    print(f"Shard {shard}/{n_shards}: {len(samples)} samples in {shard_dir}")
+
+
+def merge(n_shards, out_dir, merged_dir):
+    # Verify and combine the outputs of all shards
+    shard_dirs = [os.path.join(out_dir, f"shard_{k:03d}") for k in range(n_shards)]
+    manifest = merge_shards(shard_dirs, merged_dir)
+    print(f"Merged {len(manifest['samples'])} samples into {merged_dir}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Run one shard of the cohort, or merge the outputs of all shards."
+    )
+    parser.add_argument("command", choices=["run", "merge"])
+    parser.add_argument("--shards", type=int, required=True, help="number of shards")
+    parser.add_argument("--shard", type=int, help="shard to run")
+    parser.add_argument("--out", default="../data/shards", help="shard directories")
+    parser.add_argument("--merged", default="../data", help="merged output")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        if args.shard is None:
+            parser.error("run requires --shard")
+        run(args.shard, args.shards, args.out)
+    else:
+        merge(args.shards, args.out, args.merged)
@@ -0,0 +1,214 @@
+import queue
+import threading
+
+import numpy as np
+
+from processing.signal import Signal
+
+
+def is_mat73(path):
+    """
+    Check whether a MAT file uses the v7.3 (HDF5) format.
+
+    Parameters:
+        path (str): Path to the MAT file.
+
+    Returns:
+        bool: True for v7.3 files, False for v4/v5 files.
+    """
+    # MATLAB writes its text header into the first bytes of the HDF5 userblock
+    with open(path, "rb") as f:
+        header = f.read(128)
+
+    return b"MATLAB 7.3" in header
+
+
+class MatDataset:
+    """
+    Lazy reader for the signal and ground truth matrices of a MAT file.
+
+    Samples are only read when requested. For v7.3 (HDF5) files each sample is
+    sliced directly from disk with h5py, so the full matrices are never held in
+    memory. For v5 files SciPy can only read whole variables, so the requested
+    matrices are loaded once on first access instead of at construction time.
+
+    Parameters:
+        path (str): Path to the MAT file.
+        sig_key (str): Name of the signal matrix (samples x time).
+        gt_key (str): Name of the ground truth matrix (samples x time).
+        t_key (str): Name of the time vector. Only its first and last values
+            are read, to set the start time and sampling frequency.
+        fs (float or None): Sampling frequency (Hz). Inferred from the time
+            vector if None.
+        prefetch (int): Number of samples to read ahead in a background
+            thread while iterating. 0 disables prefetching.
+    """
+
+    def __init__(self, path, sig_key="X", gt_key="GT", t_key="t", fs=None, prefetch=0):
+        self.path = path
+        self.sig_key = sig_key
+        self.gt_key = gt_key
+        self.t_key = t_key
+        self.prefetch = prefetch
+        self._fs = fs
+        self._t0 = None
+        self._h5 = None
+        self._mat = None
+
+    def _open(self):
+        # Open the file on first access only
+        if self._h5 is not None or self._mat is not None:
+            return
+
+        if is_mat73(self.path):
+            try:
+                import h5py
+            except ImportError as exc:
+                raise ImportError(
+                    "Reading MAT v7.3 files requires h5py (pip install h5py)"
+                ) from exc
+            self._h5 = h5py.File(self.path, "r")
+        else:
+            from scipy.io import loadmat
+
+            self._mat = loadmat(
+                self.path, variable_names=[self.sig_key, self.gt_key, self.t_key]
+            )
+
+    def _row(self, key, i):
+        # HDF5 stores MATLAB matrices column-major, so samples are columns
+        self._open()
+        if self._h5 is not None:
+            return np.asarray(self._h5[key][:, i], dtype=float)
+        return self._mat[key][i]  # type: ignore[index]
+
+    def _time_info(self):
+        # Read only the ends of the time vector
+        if self._t0 is None:
+            self._open()
+            if self._h5 is not None:
+                t = self._h5[self.t_key]
+                first, last = float(t[0, 0]), float(t[-1, -1])
+                n = t.size
+            else:
+                t = self._mat[self.t_key].ravel()  # type: ignore[index]
+                first, last, n = float(t[0]), float(t[-1]), t.size
+            self._t0 = first
+            if self._fs is None:
+                self._fs = (n - 1) / (last - first) if n > 1 else 1.0
+        return self._t0, self._fs
+
+    @property
+    def t0(self):
+        """Time of the first sample."""
+        return self._time_info()[0]
+
+    @property
+    def fs(self):
+        """Sampling frequency (Hz)."""
+        return self._time_info()[1]
+
+    def __len__(self):
+        self._open()
+        if self._h5 is not None:
+            return self._h5[self.sig_key].shape[1]
+        return self._mat[self.sig_key].shape[0]  # type: ignore[index]
+
+    def name(self, i):
+        """Sample name for the zero-based index i."""
+        return f"sample_{i + 1:02d}"
+
+    def read(self, i, with_gt=True):
+        """
+        Read a single sample.
+
+        Parameters:
+            i (int): Zero-based sample index.
+            with_gt (bool): Also read the ground truth row.
+
+        Returns:
+            dict: Raw and (optionally) ground truth signals as Signal
+            containers.
+        """
+        if not 0 <= i < len(self):
+            raise IndexError(f"sample index {i} out of range")
+        t0, fs = self._time_info()
+        sample = {"raw": Signal(self._row(self.sig_key, i), fs, t0)}
+        if with_gt:
+            sample["gt"] = Signal(self._row(self.gt_key, i), fs, t0)
+        return sample
+
+    def __getitem__(self, i):
+        return self.read(i)
+
+    def items(self, with_gt=True, indices=None):
+        """
+        Yield (name, sample) pairs, optionally prefetching ahead.
+
+        Parameters:
+            with_gt (bool): Also read the ground truth rows.
+            indices (list or None): Zero-based sample indices to read, all
+                samples if None.
+        """
+        if indices is None:
+            indices = range(len(self))
+
+        if self.prefetch <= 0:
+            for i in indices:
+                yield self.name(i), self.read(i, with_gt)
+            return
+
+        yield from self._prefetch_iter(with_gt, indices)
+
+    def __iter__(self):
+        return self.items()
+
+    def _prefetch_iter(self, with_gt, indices):
+        # Bounded queue so the reader never runs more than prefetch samples ahead
+        buf = queue.Queue(maxsize=self.prefetch)
+        stop = threading.Event()
+        done = object()
+
+        def reader():
+            try:
+                for i in indices:
+                    if stop.is_set():
+                        return
+                    buf.put((self.name(i), self.read(i, with_gt)))
+                buf.put(done)
+            except BaseException as exc:  # noqa: BLE001
+                # Forward any error to the consumer thread, which re-raises it
+                buf.put(exc)
+
+        thread = threading.Thread(target=reader, daemon=True)
+        thread.start()
+
+        try:
+            while True:
+                item = buf.get()
+                if item is done:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            # Unblock the reader if the consumer stopped early
+            stop.set()
+            while thread.is_alive():
+                try:
+                    buf.get_nowait()
+                except queue.Empty:
+                    thread.join(0.01)
+
+    def close(self):
+        """Release the underlying file handle."""
+        if self._h5 is not None:
+            self._h5.close()
+        self._h5 = None
+        self._mat = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
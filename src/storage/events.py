@@ -0,0 +1,143 @@
+import numpy as np
+
+from processing.signal import Events
+
+
+class EventTable:
+    """
+    Peak events of many samples in one compact table.
+
+    Indices and amplitudes of all samples are concatenated into two arrays,
+    with per-sample offsets marking where each sample starts, and are stored
+    in a single NPZ file instead of one text file per sample.
+
+    Parameters:
+        fs (float): Sampling frequency (Hz) shared by all samples.
+        t0 (float): Time of the first sample shared by all samples.
+    """
+
+    def __init__(self, fs, t0=0.0):
+        self.fs = fs
+        self.t0 = t0
+        self._names = []
+        self._pos = {}
+        self._index = []
+        self._amplitude = []
+
+    def __len__(self):
+        return len(self._names)
+
+    def __contains__(self, name):
+        return name in self._pos
+
+    @property
+    def names(self):
+        """Sample names in insertion order."""
+        return list(self._names)
+
+    def append(self, name, events):
+        """
+        Add the events of one sample.
+
+        Parameters:
+            name (str): Sample name.
+            events (Events): Peak events of the sample.
+        """
+        if name in self._pos:
+            raise ValueError(f"duplicate sample {name!r}")
+        self._pos[name] = len(self._names)
+        self._names.append(name)
+        self._index.append(np.asarray(events.index, dtype=np.int64))
+        self._amplitude.append(np.asarray(events.amplitude, dtype=float))
+
+    def append_peaks(self, name, peak_t, peak_v):
+        """
+        Add detected peaks given as times and values.
+
+        Parameters:
+            name (str): Sample name.
+            peak_t (array): Peak times on the sample grid.
+            peak_v (array): Peak values.
+        """
+        self.append(name, Events.from_times(peak_t, peak_v, self.fs, self.t0))
+
+    def extend(self, other):
+        """Add all samples of another table with the same time axis."""
+        if (other.fs, other.t0) != (self.fs, self.t0):
+            raise ValueError("event tables have different time axes")
+        for name in other.names:
+            self.append(name, other[name])
+
+    def __getitem__(self, name):
+        """
+        Events of one sample.
+
+        Parameters:
+            name (str): Sample name.
+
+        Returns:
+            Events: Indices and amplitudes of the sample.
+        """
+        i = self._pos[name]
+        return Events(self._index[i], self._amplitude[i], self.fs, self.t0)
+
+    def to_dense(self, name, n):
+        """
+        Rebuild the dense signal of one sample, zero outside the peaks.
+
+        Parameters:
+            name (str): Sample name.
+            n (int): Signal length.
+
+        Returns:
+            array: Dense signal.
+        """
+        events = self[name]
+        dense = np.zeros(n)
+        dense[events.index] = events.amplitude
+        return dense
+
+    def save(self, path):
+        """
+        Write the table to a single NPZ file.
+
+        Parameters:
+            path (str): Output file path.
+        """
+        counts = [len(idx) for idx in self._index]
+        offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+        np.savez(
+            path,
+            names=np.array(self._names, dtype=str),
+            offsets=offsets,
+            index=np.concatenate(self._index or [np.zeros(0, dtype=np.int64)]),
+            amplitude=np.concatenate(self._amplitude or [np.zeros(0)]),
+            fs=self.fs,
+            t0=self.t0,
+        )
+
+    @classmethod
+    def load(cls, path):
+        """
+        Read a table written by save.
+
+        Parameters:
+            path (str): NPZ file path.
+
+        Returns:
+            EventTable: Loaded table.
+        """
+        with np.load(path) as data:
+            table = cls(float(data["fs"]), float(data["t0"]))
+            names = data["names"].tolist()
+            offsets = data["offsets"]
+            index = data["index"]
+            amplitude = data["amplitude"]
+
+        # Per-sample views into the concatenated arrays
+        table._names = names
+        table._pos = {name: i for i, name in enumerate(names)}
+        if names:
+            table._index = np.split(index, offsets[1:-1])
+            table._amplitude = np.split(amplitude, offsets[1:-1])
+        return table
@@ -0,0 +1,197 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from analysis.metrics_table import METRIC_NAMES, MetricsTable
+from storage.events import EventTable
+
+# Name of the manifest written into every shard and merged output directory
+MANIFEST = "manifest.json"
+
+
+def shard_of(key, n_shards):
+    """
+    Shard of a sample, from a hash of its key.
+
+    The assignment only depends on the key and the number of shards, so every
+    machine computes the same split without coordination.
+
+    Parameters:
+        key (str): Sample key, such as its name.
+        n_shards (int): Number of shards.
+
+    Returns:
+        int: Shard number in [0, n_shards).
+    """
+    digest = hashlib.sha256(key.encode()).digest()
+    return int.from_bytes(digest[:8], "big") % n_shards
+
+
+def shard_indices(names, shard, n_shards):
+    """
+    Indices of the samples assigned to one shard.
+
+    Parameters:
+        names (list): Sample keys of the cohort, in order.
+        shard (int): Shard number.
+        n_shards (int): Number of shards.
+
+    Returns:
+        list: Zero-based indices of the shard samples.
+    """
+    if not 0 <= shard < n_shards:
+        raise ValueError(f"shard {shard} out of range for {n_shards} shards")
+    return [i for i, name in enumerate(names) if shard_of(name, n_shards) == shard]
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    """SHA-256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _checksums(root):
+    # Checksums of all files below root except the manifest, by relative path
+    files = {}
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            rel = os.path.relpath(path, root).replace(os.sep, "/")
+            if rel != MANIFEST:
+                files[rel] = file_sha256(path)
+    return dict(sorted(files.items()))
+
+
+def write_manifest(root, **info):
+    """
+    Write the manifest of an output directory.
+
+    Parameters:
+        root (str): Output directory.
+        **info: Extra JSON fields, such as the shard number and its samples.
+
+    Returns:
+        dict: The manifest, with the SHA-256 of every file under "files".
+    """
+    manifest = {**info, "files": _checksums(root)}
+    with open(os.path.join(root, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=4)
+    return manifest
+
+
+def verify_manifest(root):
+    """
+    Check the files of an output directory against its manifest.
+
+    Parameters:
+        root (str): Output directory.
+
+    Returns:
+        dict: The manifest.
+
+    Raises:
+        ValueError: If a listed file is missing or its checksum differs.
+    """
+    with open(os.path.join(root, MANIFEST)) as f:
+        manifest = json.load(f)
+    for rel, expected in manifest["files"].items():
+        path = os.path.join(root, rel)
+        if not os.path.exists(path):
+            raise ValueError(f"{root}: missing file {rel}")
+        if file_sha256(path) != expected:
+            raise ValueError(f"{root}: checksum mismatch for {rel}")
+    return manifest
+
+
+def merge_shards(shard_dirs, out_root):
+    """
+    Combine the peaks and metrics of all shards into one result.
+
+    Every shard is verified against its manifest first, and the shards must
+    cover each shard number exactly once. Event tables and metrics rows are
+    written in the original sample order. The merged manifest records the
+    checksums of the merged files and of each shard manifest.
+
+    Parameters:
+        shard_dirs (list): Shard output directories.
+        out_root (str): Merged output directory.
+
+    Returns:
+        dict: The merged manifest.
+    """
+    # Verify every shard and check that the shards form a complete split
+    manifests = [verify_manifest(root) for root in shard_dirs]
+    n_shards = {m["n_shards"] for m in manifests}
+    if len(n_shards) != 1:
+        raise ValueError("shards come from runs with different shard counts")
+    n_shards = n_shards.pop()
+    shards = sorted(m["shard"] for m in manifests)
+    if shards != list(range(n_shards)):
+        raise ValueError(f"expected shards 0 to {n_shards - 1}, got {shards}")
+
+    # Original position of every sample, to restore the cohort order
+    order = {}
+    for m in manifests:
+        for name, i in zip(m["samples"], m["indices"]):
+            if name in order:
+                raise ValueError(f"sample {name!r} appears in several shards")
+            order[name] = i
+
+    def by_order(names):
+        return sorted(names, key=order.__getitem__)
+
+    # Merge event tables: ground truth and the peaks of each method
+    tables = [
+        "signals/ground_truth/ground_truth.npz",
+        *sorted(
+            rel
+            for rel in manifests[0]["files"]
+            if rel.startswith("peaks/") and rel.endswith(".npz")
+        ),
+    ]
+    for rel in tables:
+        parts = [EventTable.load(os.path.join(root, rel)) for root in shard_dirs]
+        merged = EventTable(parts[0].fs, parts[0].t0)
+        source = {name: part for part in parts for name in part.names}
+        for name in by_order(source):
+            merged.append(name, source[name][name])
+        os.makedirs(os.path.dirname(os.path.join(out_root, rel)), exist_ok=True)
+        merged.save(os.path.join(out_root, rel))
+
+    # Merge metrics tables, ordered by sample and then by row within a shard
+    rows = []
+    for root in shard_dirs:
+        arrays = MetricsTable.load(os.path.join(root, "metrics/metrics.npz")).arrays()
+        rows.extend(
+            zip(arrays["sample"], arrays["method"], arrays["params"], arrays["values"])
+        )
+    rows.sort(key=lambda row: order[row[0]])
+    metrics_table = MetricsTable()
+    for sample, method, params, values in rows:
+        met = dict(zip(METRIC_NAMES, np.asarray(values, dtype=float)))
+        metrics_table.add(str(sample), str(method), met, str(params))
+    os.makedirs(os.path.join(out_root, "metrics"), exist_ok=True)
+    metrics_table.save(os.path.join(out_root, "metrics/metrics.npz"))
+
+    # Manifest of the merged files, pinning the shards they came from
+    merged_files = {
+        rel: file_sha256(os.path.join(out_root, rel))
+        for rel in [*tables, "metrics/metrics.npz"]
+    }
+    manifest = {
+        "n_shards": n_shards,
+        "samples": by_order(order),
+        "shards": {
+            os.path.abspath(root): file_sha256(os.path.join(root, MANIFEST))
+            for root in shard_dirs
+        },
+        "files": merged_files,
+    }
+    with open(os.path.join(out_root, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=4)
+    return manifest
@@ -0,0 +1,50 @@
+import numpy as np
+
+from processing.signal import Signal
+
+
+def save_signal(path, signal, fmt="%.6f"):
+    """
+    Write the samples of a signal to a text file, one value per line.
+
+    The start time and sampling frequency go into the header instead of a
+    time column.
+
+    Parameters:
+        path (str): Output file path.
+        signal (Signal): Signal to save.
+        fmt (str): Number format of the samples.
+    """
+    np.savetxt(
+        path,
+        signal.samples,
+        fmt=fmt,
+        header=f"t0={signal.t0!r},fs={signal.fs!r}",
+    )
+
+
+def load_signal(path):
+    """
+    Read a signal written by save_signal.
+
+    Older files with a time column followed by a value column are also
+    accepted, in which case their time vector is kept as is.
+
+    Parameters:
+        path (str): Signal file path.
+
+    Returns:
+        Signal: Loaded signal.
+    """
+    with open(path) as f:
+        first = f.readline()
+
+    # Implicit time axis described by the header
+    if first.startswith("#"):
+        fields = dict(item.split("=") for item in first[1:].strip().split(","))
+        samples = np.loadtxt(path, ndmin=1)
+        return Signal(samples, float(fields["fs"]), float(fields["t0"]))
+
+    # Legacy files with an explicit time column
+    data = np.loadtxt(path, delimiter=",", ndmin=2)
+    return Signal.from_time(data[:, 0], data[:, 1])
@@ -0,0 +1,109 @@
+import contextlib
+import queue
+import threading
+
+import numpy as np
+
+
+class AsyncWriter:
+    """
+    Background writer that overlaps text serialization and disk I/O with
+    computation.
+
+    Write jobs are placed on a bounded queue and executed by a pool of worker
+    threads. Once a worker raises, the writer stays failed: later jobs are
+    skipped and the first error is re-raised in the caller on every following
+    submit, flush or close, so no write is lost silently.
+
+    Parameters:
+        max_queue (int): Maximum number of pending jobs before submit blocks.
+        workers (int): Number of writer threads.
+    """
+
+    def __init__(self, max_queue=16, workers=2):
+        self._jobs = queue.Queue(maxsize=max_queue)
+        self._error = None
+        self._lock = threading.Lock()
+        self._closed = False
+        self._threads = [
+            threading.Thread(target=self._worker, daemon=True) for _ in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _worker(self):
+        while True:
+            job = self._jobs.get()
+            try:
+                if job is None:
+                    return
+                # Skip remaining jobs once a write has failed
+                if self._error is None:
+                    func, args, kwargs = job
+                    func(*args, **kwargs)
+            except BaseException as exc:  # noqa: BLE001
+                # Any failure of a write job is recorded and re-raised in the
+                # caller, a worker thread has nowhere else to report it
+                with self._lock:
+                    if self._error is None:
+                        self._error = exc
+            finally:
+                self._jobs.task_done()
+
+    def _raise_error(self):
+        # The error is kept, so every later call reports the failed write
+        if self._error is not None:
+            raise self._error
+
+    def submit(self, func, *args, **kwargs):
+        """
+        Queue an arbitrary write call.
+
+        Parameters:
+            func (callable): Function performing the write.
+            *args, **kwargs: Arguments passed to func.
+        """
+        self._raise_error()
+        if self._closed:
+            raise RuntimeError("writer is closed")
+        self._jobs.put((func, args, kwargs))
+
+    def savetxt(self, path, arr, **kwargs):
+        """
+        Queue a np.savetxt call. The array must not be modified afterwards.
+
+        Parameters:
+            path (str): Output file path.
+            arr (array): Array to save.
+            **kwargs: Keyword arguments passed to np.savetxt.
+        """
+        self.submit(np.savetxt, path, arr, **kwargs)
+
+    def flush(self):
+        """Block until all queued writes are done and re-raise any error."""
+        self._jobs.join()
+        self._raise_error()
+
+    def close(self):
+        """Flush pending writes and stop the worker threads."""
+        if self._closed:
+            self._raise_error()
+            return
+        self._jobs.join()
+        for _ in self._threads:
+            self._jobs.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._closed = True
+        self._raise_error()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Do not mask an exception raised inside the with block
+        if exc_type is None:
+            self.close()
+        else:
+            with contextlib.suppress(Exception):
+                self.close()
@@ -0,0 +1,64 @@
+import json
+import os
+
+from analysis.tuning import successive_halving
+
+# Cohort and reference peak
+data_path = "../data/signals/raw/data.mat"
+ref_path = "../data/signals/ref_peak.mat"
+
+# Sampling frequency (Hz)
+fs = 10
+
+# Search spaces and constant parameters of each method
+searches = {
+    "hybrid": {
+        "space": {
+            "lc": (0.002, 0.05, "log"),
+            "hc": (0.05, 0.5, "log"),
+            "th": (0.001, 0.2, "log"),
+        },
+        "fixed": {"fs": fs, "order": 1},
+    },
+    "custom": {
+        "space": {
+            "lam": (1e6, 1e10, "log"),
+            "pen": (1e-4, 1e-1, "log"),
+            "th": (0.02, 0.5, "log"),
+        },
+        "fixed": {"win_len": 151, "poly_order": 3, "max_iter": 50},
+    },
+}
+
+# Objective to maximize, one of the metrics or "f1"
+objective = "f1"
+
+if __name__ == "__main__":
+    # Ensure output directory exists
+    os.makedirs("../data/tuning/", exist_ok=True)
+
+    best = {}
+    for method, search in searches.items():
+        # Tune with successive halving, resuming from the trial log if present
+        result = successive_halving(
+            method,
+            search["space"],
+            data_path,
+            n_configs=27,
+            eta=3,
+            rungs=3,
+            objective=objective,
+            fixed=search["fixed"],
+            ref_path=ref_path,
+            tol=0.5,
+            log_path=f"../data/tuning/{method}_trials.jsonl",
+            seed=0,
+        )
+
+        # Report the best configuration
+        best[method] = {**search["fixed"], **result["config"]}
+        print(f"{method}: {objective} = {result['score']:.3f} with {best[method]}")
+
+    # Save the best parameters of each method
+    with open("../data/tuning/best_params.json", "w") as f:
+        json.dump(best, f, indent=4)